@@ -1,41 +1,26 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
-def run_experiment(n_flips=100, p=0.5):
-    return np.random.binomial(1, p, n_flips)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from coinlab import FlipSource, PatternAutomaton, parallel_sweep, refine_sweep, run_stats, sample_questions
 
-def has_series_of_heads(flips, series_length=5):
-    if len(flips) < series_length:
-        return False
-    for i in range(len(flips) - series_length + 1):
-        if np.all(flips[i:i+series_length] == 1):
-            return True
-    return False
+FLIPS = FlipSource()
 
-def max_series_length(flips):
-    max_len = 0
-    current_len = 0
-    for flip in flips:
-        if flip == 1:
-            current_len += 1
-        else:
-            max_len = max(max_len, current_len)
-            current_len = 0
-    max_len = max(max_len, current_len)
-    return max_len
+def run_experiments(n_simulations=10000, n_flips=100, p=0.5, series_length=5):
+    flips = FLIPS.flips(n_simulations, n_flips, p)
+    return np.sum(flips, axis=1), run_stats(flips, series_length).has_run
+
+def pattern_probabilities(patterns, n_simulations=10000, n_flips=100, p=0.5):
+    automaton = PatternAutomaton(patterns)
+    observed = np.mean(automaton.first_hits(FLIPS.flips(n_simulations, n_flips, p)) >= 0, axis=0)
+    return observed, automaton.probabilities(n_flips, p)['occurs']
 
 def solve_symmetric_case(n_simulations=10000, n_flips=100):
     print("Симметричная монета (p=0.5)")
-    heads_counts = []
-    series_found_count = 0
-    
-    for _ in range(n_simulations):
-        flips = run_experiment(n_flips, p=0.5)
-        heads_counts.append(np.sum(flips))
-        if has_series_of_heads(flips, 5):
-            series_found_count += 1
-            
-    heads_counts = np.array(heads_counts)
+    heads_counts, has_series = run_experiments(n_simulations, n_flips, p=0.5)
+    series_found_count = np.count_nonzero(has_series)
     
     avg_heads = np.mean(heads_counts)
     print(f"1. Какое число орлов выпадает в среднем: {avg_heads:.2f}")
@@ -61,37 +46,31 @@ def solve_symmetric_case(n_simulations=10000, n_flips=100):
     prob_series = series_found_count / n_simulations
     print(f"5. С какой вероятностью найдется хотябы одна серия из 5 орлов подряд: {prob_series:.4f}")
 
-def solve_asymmetric_case(n_simulations=1000, n_flips=100):
-    print("\nНесимметричная монета")
-    p_values = np.linspace(0, 1, 51)
-    
-    avg_heads_list = []
-    interval_widths_list = []
-    series_prob_list = []
-    max_series_len_list = []
-    
-    for p in p_values:
-        heads_counts = []
-        series_found_count = 0
-        max_series_lengths = []
-        
-        for _ in range(n_simulations):
-            flips = run_experiment(n_flips, p)
-            heads_counts.append(np.sum(flips))
-            if has_series_of_heads(flips, 5):
-                series_found_count += 1
-            max_series_lengths.append(max_series_length(flips))
+    patterns = ["HTHTH", "HHHHH", "TTHH"]
+    observed, exact = pattern_probabilities(patterns, n_simulations, n_flips)
+    print("Вероятность встретить последовательность (моделирование / точно):")
+    for pattern, observed_prob, exact_prob in zip(patterns, observed, exact):
+        print(f"   {pattern}: {observed_prob:.4f} / {exact_prob:.4f}")
 
-        heads_counts = np.array(heads_counts)
-        
-        avg_heads_list.append(np.mean(heads_counts))
-        
-        lower_bound = np.percentile(heads_counts, 2.5)
-        upper_bound = np.percentile(heads_counts, 97.5)
-        interval_widths_list.append(upper_bound - lower_bound)
-        
-        series_prob_list.append(series_found_count / n_simulations)
-        max_series_len_list.append(np.mean(max_series_lengths))
+    print("Выборка с уменьшением дисперсии (оценка ± ошибка, выигрыш в размере выборки):")
+    for sampling in ("antithetic", "stratified"):
+        answers = sample_questions(sampling, n_simulations, n_flips, 0.5, rng=FLIPS.rng)
+        for name in ("prob_gt_60", "prob_series_5"):
+            answer = answers[name]
+            print(f"   {sampling}, {name}: {answer['estimate']:.4f} ± {answer['std_error']:.4f} (x{answer['gain']:.2f})")
+
+def solve_asymmetric_case(n_simulations=1000, n_flips=100, seed=None, n_workers=None, budget=None):
+    print("\nНесимметричная монета")
+    if budget is None:
+        sweep = parallel_sweep(np.linspace(0, 1, 51), n_simulations, n_flips, seed=seed, n_workers=n_workers)
+    else:
+        sweep = refine_sweep(budget, n_simulations, n_tosses=n_flips, rng=seed)
+        print(f"Адаптивная сетка: {len(sweep['p_values'])} значений p, {sweep['n_simulated']} экспериментов")
+    p_values = sweep['p_values']
+    avg_heads_list = sweep['mean_heads']
+    interval_widths_list = sweep['interval_width']
+    series_prob_list = sweep['prob_series_5']
+    max_series_len_list = sweep['mean_max_series']
 
     fig, axs = plt.subplots(2, 2, figsize=(14, 10))
     fig.suptitle("Зависимость метрик от вероятности выпадения орла (p)")
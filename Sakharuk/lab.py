@@ -1,36 +1,25 @@
-import random;
+import os
+import sys
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from coinlab import FlipSource, HeadCountHistogram, sample_max_run
+
+FLIPS = FlipSource()
+
 def maxLengthOfSerie(totalExp = 100000, p = 0.5):
-    maxLength = 0
-    for i in range(totalExp):
-        res = exp100(p=p)
-        currentLength = 0
-        for item in res:
-            if(item == 0):
-                currentLength += 1
-            else:
-                if(currentLength > maxLength):
-                    maxLength = currentLength
-                currentLength = 0
-        if(currentLength > maxLength):
-            maxLength = currentLength
-    return maxLength
-
-def exp100 (n=100, p=0.5):
-    res = []
-    for i in range(n):
-        if(random.random() < p):
-            res.append(0)
-        else:
-            res.append(1)
-    return res
+    # the longest serie over totalExp experiments, drawn from the exact distribution CDF^totalExp
+    return int(sample_max_run(100, p, totalExp, rng=FLIPS.rng))
+
+def multipleFlips(totalExp, n=100, p=0.5):
+    # 0 is an eagle; the flips are drawn in bulk
+    for res in FLIPS.flip_lists(totalExp, n, p):
+        yield [1 - flip for flip in res]
 
 def multipleExp100(n=100, totalExp=100000, p=0.5):
     eagles=[]
     successful = 0
-    for exp in range(totalExp):
-        res100 = exp100(n,p)
+    for res100 in multipleFlips(totalExp, n, p):
         eaglesNum = 0
 
         isSeries = False
@@ -52,38 +41,17 @@ def multipleExp100(n=100, totalExp=100000, p=0.5):
     return successful, eagles
 
 def numEaglesGreater60(res, totalExp=100000):
-    num60 = 0
-    for i in range(totalExp):
-        if(res[i] > 60):
-            num60 += 1
-    return num60
+    hist = HeadCountHistogram.from_counts(res[:totalExp])
+    return hist.count_between(61, hist.n_tosses + 1)
 
 def intervals(res, totalExp = 100000):
-    probabilities = []
-    for i in range(10):
-        numInInterval = 0
-        for j in range(totalExp):
-            if(i+1 == 10):
-                if(res[j] <= (i+1)*10 and res[j] >= (i)*10):
-                    numInInterval += 1
-            elif(res[j] < (i+1)*10 and res[j] >= (i)*10):
-                numInInterval += 1
-        probabilities.append(numInInterval / totalExp)
-    return probabilities
+    hist = HeadCountHistogram.from_counts(res[:totalExp])
+    return list(hist.bin_probs(range(0, 101, 10)))
     
 def probability95prc(res, totalExp=100000, p = 0.5):
-    newP = p
-    right = p * 100
-    left = p * 100 + 1
-    while(newP < 0.95):
-        right += 1
-        left -= 1
-        numInInterval = 0
-        for i in range(totalExp):
-            if(res[i] >= left and res[i] < right):
-                numInInterval += 1
-        newP = numInInterval / totalExp
-    return left, right
+    hist = HeadCountHistogram.from_counts(res[:totalExp])
+    left, right = hist.shortest_interval(0.95)
+    return left, right + 1
 
 def setGraphics():
     x = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
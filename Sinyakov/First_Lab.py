@@ -1,95 +1,197 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import binom
 import seaborn as sns
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from coinlab import (FlipSource, HeadCountHistogram, LazyTosses, PackedTosses, Profiler, ResultCache,
+                     RunLengthTosses, ThreadedFlipSource, adaptive_estimate, analyze_analytic, importance_tail_probs,
+                     run_stats, sample_questions, stream_experiments, stream_long_experiments, sweep_analytic,
+                     sweep_p_coupled)
+from coinlab.cache import restore_rng_state, rng_state
+from coinlab.profiling import phase
+
 plt.style.use('default')
 sns.set_palette("husl")
 
 class CoinExperiment:
-    def __init__(self, n_tosses=100, n_experiments=100, random_seed=None):
+    def __init__(self, n_tosses=100, n_experiments=100, random_seed=None,
+                 storage='memory', storage_path=None, chunk_rows=1 << 16, backend='simulation',
+                 flip_source=None, cache=None, n_threads=None, profiler=None):
         self.n_tosses = n_tosses
+        self.profiler = profiler
         self.n_experiments = n_experiments
+        self.backend = backend
+        self.flip_source = flip_source
+        self.cache = cache
+        self.storage = storage
+        self.storage_path = storage_path
+        self.chunk_rows = chunk_rows
         if random_seed is not None:
             np.random.seed(random_seed)
+        if flip_source is None:
+            if n_threads is not None:
+                self.flip_source = ThreadedFlipSource(seed=random_seed, n_threads=n_threads)
+            else:
+                self.flip_source = FlipSource(seed=random_seed)
         self.results = None
         self.all_tosses = None
+        self.accumulator = None
         
     def simulate_experiments(self, p=0.5):
-        self.all_tosses = np.random.choice([0, 1], size=(self.n_experiments, self.n_tosses), p=[1-p, p])
+        # flips are credited only where the phase draws the whole toss matrix,
+        # so lazy, rle, stream and cache hits report no flips/sec
+        with phase(self.profiler, 'simulate_experiments') as frame:
+            if self.storage == 'stream':
+                return self.simulate_streaming(p)
+            if self.storage == 'lazy':
+                return self.simulate_lazy(p)
+            if self.storage == 'rle':
+                return self.simulate_rle(p)
+            if self.storage == 'packed':
+                self.credit_flips(frame)
+                return self.simulate_packed(p)
+            if self.cache is not None:
+                return self.simulate_cached(p, frame)
+            self.credit_flips(frame)
+            self.all_tosses = self.generate(self.n_experiments, p)
+            self.results = np.sum(self.all_tosses, axis=1)
+            return self.results, self.all_tosses
+    
+    def credit_flips(self, frame):
+        if frame is not None:
+            frame['flips'] = self.n_experiments * self.n_tosses
+    
+    def simulate_cached(self, p=0.5, frame=None):
+        params = {'n_tosses': self.n_tosses, 'n_experiments': self.n_experiments, 'p': p,
+                  'rng': rng_state(self.flip_source)}
+        entry = self.cache.get('simulate_experiments', params)
+        if entry is None:
+            self.credit_flips(frame)
+            tosses = self.generate(self.n_experiments, p)
+            entry = {'packed': np.packbits(tosses.astype(bool), axis=1), 'dtype': np.array(tosses.dtype.str),
+                     'rng_after': np.array(rng_state(self.flip_source))}
+            self.cache.put('simulate_experiments', params, entry)
+        else:
+            restore_rng_state(str(entry['rng_after']), self.flip_source)
+        packed = entry['packed']
+        self.all_tosses = np.unpackbits(packed, axis=1, count=self.n_tosses).astype(str(entry['dtype']))
         self.results = np.sum(self.all_tosses, axis=1)
         return self.results, self.all_tosses
     
+    def generate(self, n_experiments, p=0.5):
+        return self.flip_source(n_experiments, self.n_tosses, p)
+    
+    def simulate_packed(self, p=0.5):
+        packed = PackedTosses.create(self.n_experiments, self.n_tosses, self.storage_path, self.chunk_rows)
+        for start in range(0, self.n_experiments, self.chunk_rows):
+            rows = min(self.chunk_rows, self.n_experiments - start)
+            packed.write_packed(start, self.flip_source.packed_flips(rows, self.n_tosses, p))
+        packed.flush()
+        self.all_tosses = packed
+        self.results, self.accumulator = packed.scan(5)
+        return self.results, self.all_tosses
+    
+    def simulate_lazy(self, p=0.5):
+        self.all_tosses = LazyTosses(self.n_experiments, self.n_tosses, p, self.flip_source.rng)
+        self.results = self.all_tosses.head_counts()
+        return self.results, self.all_tosses
+    
+    def simulate_rle(self, p=0.5):
+        self.all_tosses = RunLengthTosses.generate(self.n_experiments, self.n_tosses, p, self.flip_source.rng)
+        self.results = self.all_tosses.head_counts()
+        return self.results, self.all_tosses
+    
+    def simulate_streaming(self, p=0.5):
+        self.accumulator = stream_experiments(self.n_experiments, self.n_tosses, p, self.chunk_rows,
+                                              generate=self.flip_source)
+        return self.accumulator
+    
+    def longest_run_growth(self, p=0.5, lengths=(10 ** 2, 10 ** 4, 10 ** 6), n_experiments=100, chunk_tosses=1 << 16):
+        _, snapshots = stream_long_experiments(n_experiments, max(lengths), p, chunk_tosses,
+                                               generate=self.flip_source, checkpoints=lengths)
+        return {n: np.mean(snapshots[n][1].max_run) for n in lengths}
+    
+    def analyze_to_precision(self, p=0.5, targets=None, batch_size=1000, max_experiments=10 ** 7):
+        return adaptive_estimate(p, targets, self.n_tosses, batch_size, max_experiments,
+                                 generate=self.flip_source)
+    
+    def analyze_tails(self, p=0.5, n_samples=10000):
+        return importance_tail_probs(p, self.n_tosses, n_samples, rng=np.random.randint(2 ** 31))
+    
+    def analyze_variance_reduced(self, p=0.5, mode='stratified'):
+        return sample_questions(mode, self.n_experiments, self.n_tosses, p, rng=np.random.randint(2 ** 31))
+    
+    def load_packed(self, path):
+        packed = PackedTosses(path, self.n_tosses, chunk_rows=self.chunk_rows)
+        self.storage = 'packed'
+        self.n_experiments = len(packed)
+        self.all_tosses = packed
+        self.results, self.accumulator = packed.scan(5)
+        return self.results, self.all_tosses
+    
     def find_series(self, tosses, series_length=5):
-        max_series = 0
-        current_series = 0
-        
-        for result in tosses:
-            if result == 1: 
-                current_series += 1
-                if current_series > max_series:
-                    max_series = current_series
-            else: 
-                current_series = 0
-        
-        has_series = max_series >= series_length
-        return has_series, max_series
+        stats = run_stats(tosses, series_length)
+        return bool(stats.has_run[0]), int(stats.max_run[0])
     
     def multiple_experiments(self, n_experiments, p=0.5):
-        experiments = np.random.choice([0, 1], size=(n_experiments, self.n_tosses), p=[1-p, p])
+        experiments = self.generate(n_experiments, p)
         return experiments
     
-    def analyze_experiments(self, p=0.5):
+    def analyze_experiments(self, p=0.5, runs=True):
+        if self.backend == 'analytic':
+            return analyze_analytic(self.n_tosses, p)
+        if self.storage == 'stream':
+            if self.accumulator is None:
+                self.simulate_streaming(p)
+            return self.accumulator.result()
         if self.results is None:
             self.simulate_experiments(p)
             
-        mean_heads = np.mean(self.results)
-        
-        prob_gt_60 = np.mean(self.results > 60)
-        
-        bins = np.arange(0, 101, 10)
-        bin_probs = []
-        for i in range(len(bins)-1):
-            if i == len(bins)-2:
-                mask = (self.results >= bins[i]) & (self.results <= bins[i+1])
-            else:
-                mask = (self.results >= bins[i]) & (self.results < bins[i+1])
-            bin_probs.append(np.mean(mask))
-        
-        sorted_results = sorted(self.results)
-        lower_index = int(0.025 * len(sorted_results))
-        upper_index = int(0.975 * len(sorted_results))
-        lower_index = max(0, lower_index)
-        upper_index = min(len(sorted_results) - 1, upper_index)
-        
-        confidence_interval = (sorted_results[lower_index], sorted_results[upper_index])
-        interval_width = sorted_results[upper_index] - sorted_results[lower_index]
-        
-        series_count = 0
-        max_series_total = 0
-        for exp in self.all_tosses:
-            has_series, max_series = self.find_series(exp, 5)
-            if has_series:
-                series_count += 1
-            max_series_total += max_series
-        
-        prob_series_5 = series_count / self.n_experiments
-        mean_max_series = max_series_total / self.n_experiments
+        with phase(self.profiler, 'analyze_experiments.counts'):
+            heads = HeadCountHistogram.from_counts(self.results, self.n_tosses)
+            
+            mean_heads = np.mean(self.results)
+            
+            prob_gt_60 = heads.prob_greater(60)
+            
+            bins = np.arange(0, 101, 10)
+            bin_probs = list(heads.bin_probs(bins))
+            
+            confidence_interval = heads.quantile_interval(0.95)
+            interval_width = confidence_interval[1] - confidence_interval[0]
         
-        return {
+        analysis = {
             'mean_heads': mean_heads,
             'prob_gt_60': prob_gt_60,
             'bin_probs': bin_probs,
             'confidence_interval': confidence_interval,
             'interval_width': interval_width,
-            'prob_series_5': prob_series_5,
-            'mean_max_series': mean_max_series,
             'results': self.results,
             'all_tosses': self.all_tosses
         }
+        if not runs:
+            return analysis
+        
+        with phase(self.profiler, 'analyze_experiments.runs'):
+            if isinstance(self.all_tosses, PackedTosses):
+                summary = self.accumulator.result()
+                analysis['prob_series_5'] = summary['prob_series_5']
+                analysis['mean_max_series'] = summary['mean_max_series']
+                return analysis
+            if isinstance(self.all_tosses, (LazyTosses, RunLengthTosses)):
+                stats = self.all_tosses.run_stats(5)
+            else:
+                stats = run_stats(self.all_tosses, 5)
+        analysis['prob_series_5'] = np.mean(stats.has_run)
+        analysis['mean_max_series'] = np.mean(stats.max_run)
+        return analysis
 
-def execute_analysis():
-    experiment = CoinExperiment(n_tosses=100, n_experiments=10000, random_seed=42)
+def execute_analysis(profile_path=None):
+    profiler = Profiler() if profile_path else None
+    experiment = CoinExperiment(n_tosses=100, n_experiments=10000, random_seed=42,
+                                cache=ResultCache(sources=[__file__]), profiler=profiler)
     
     print("Лабораторная №1: Моделирование эксперимента с бросанием монеты")
     print("=" * 70)
@@ -115,8 +217,20 @@ def execute_analysis():
     intervals = ["[0,10)", "[10,20)", "[20,30)", "[30,40)", "[40,50)", 
                 "[50,60)", "[60,70)", "[70,80)", "[80,90)", "[90,100]"]
     
-    for interval, probability in zip(intervals, symmetric_results['bin_probs']):
-        print(f"   {interval}: {probability:.4f}")
+    tails = experiment.analyze_tails(p=0.5)
+    for interval, probability, tail in zip(intervals, symmetric_results['bin_probs'], tails['bin_probs']):
+        print(f"   {interval}: {probability:.4f}   (выборка по значимости: {tail['estimate']:.3e} ± {tail['std_error']:.1e})")
+    
+    print("\nОценки с заданной точностью (95% интервал):")
+    for name, entry in experiment.analyze_to_precision(p=0.5).items():
+        print(f"   {name}: {entry['estimate']:.4f} ± {entry['half_width']:.4f} "
+              f"(цель ±{entry['target']}, экспериментов: {entry['n_experiments']})")
+    
+    print("\nСнижение дисперсии (эффективный размер выборки / число экспериментов):")
+    for mode in ('antithetic', 'stratified'):
+        reduced = experiment.analyze_variance_reduced(p=0.5, mode=mode)
+        gains = ", ".join(f"{name}: {reduced[name]['gain']:.2f}" for name in ('mean_heads', 'prob_gt_60', 'prob_series_5'))
+        print(f"   {mode}: {gains}")
     
     print(f"\nПример первого эксперимента (первые 30 бросков):")
     first_experiment_tosses = symmetric_results['all_tosses'][0][:30]
@@ -144,39 +258,18 @@ def execute_analysis():
     for i in range(1, 100, 2):
         p_values.append(i / 100.0)
     
-    avg_heads = []
-    interval_widths = []
-    prob_series_5_list = []
-    avg_max_series_list = []
+    sweep = sweep_p_coupled(p_values, experiments_count_p, experiment.n_tosses, rng=42, profiler=profiler)
+    avg_heads = sweep['mean_heads']
+    interval_widths = sweep['interval_width']
+    prob_series_5_list = sweep['prob_series_5']
+    avg_max_series_list = sweep['mean_max_series']
     
-    for p in p_values:
-        experiments_p = experiment.multiple_experiments(experiments_count_p, p)
-        head_sums_p = [sum(exp) for exp in experiments_p]
-        avg_heads.append(np.mean(head_sums_p))
-        
-        if len(head_sums_p) > 1:
-            sorted_head_sums_p = sorted(head_sums_p)
-            lower_index = int(0.025 * len(sorted_head_sums_p))
-            upper_index = int(0.975 * len(sorted_head_sums_p))
-            lower_index = max(0, lower_index)
-            upper_index = min(len(sorted_head_sums_p) - 1, upper_index)
-            interval_widths.append(sorted_head_sums_p[upper_index] - sorted_head_sums_p[lower_index])
-        else:
-            interval_widths.append(0)
-        
-        series_count = 0
-        max_series_total = 0
-        for exp in experiments_p:
-            has_series, max_series = experiment.find_series(exp, 5)
-            if has_series:
-                series_count += 1
-            max_series_total += max_series
-        
-        prob_series_5_list.append(series_count / experiments_count_p)
-        avg_max_series_list.append(max_series_total / experiments_count_p)
+    exact = sweep_analytic(experiment.n_tosses, np.linspace(0.01, 0.99, 1000))
     
     ax2 = plt.subplot(2, 2, 2)
     plt.plot(p_values, avg_heads, 'o-', linewidth=2, markersize=4)
+    plt.plot(exact['p_values'], exact['mean_heads'], 'k--', linewidth=1, label='Точное значение')
+    plt.legend()
     plt.xlabel('Вероятность орла (p)')
     plt.ylabel('Среднее количество орлов')
     plt.title('6.1: Зависимость среднего количества орлов от p')
@@ -184,6 +277,8 @@ def execute_analysis():
     
     ax3 = plt.subplot(2, 2, 3)
     plt.plot(p_values, interval_widths, 's-', linewidth=2, markersize=4, color='orange')
+    plt.plot(exact['p_values'], exact['interval_width'], 'k--', linewidth=1, label='Точное значение')
+    plt.legend()
     plt.xlabel('Вероятность орла (p)')
     plt.ylabel('Ширина 95% интервала')
     plt.title('6.2: Зависимость ширины интервала от p')
@@ -191,22 +286,28 @@ def execute_analysis():
     
     ax4 = plt.subplot(2, 2, 4)
     plt.plot(p_values, prob_series_5_list, '^-', linewidth=2, markersize=4, color='green')
+    plt.plot(exact['p_values'], exact['prob_series_5'], 'k--', linewidth=1, label='Точное значение')
+    plt.legend()
     plt.xlabel('Вероятность орла (p)')
     plt.ylabel('Вероятность серии из 5')
     plt.title('6.3: Вероятность наличия серии из 5 орлов')
     plt.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.show()
+    with phase(profiler, 'plot'):
+        plt.tight_layout()
+        plt.show()
     
     fig2 = plt.figure(figsize=(8, 6))
     plt.plot(p_values, avg_max_series_list, 'd-', linewidth=2, markersize=6, color='purple')
+    plt.plot(exact['p_values'], exact['mean_max_series'], 'k--', linewidth=1, label='Точное значение')
+    plt.legend()
     plt.xlabel('Вероятность орла (p)')
     plt.ylabel('Длина максимальной серии')
     plt.title('6.4: Средняя длина максимальной серии')
     plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.show()
+    with phase(profiler, 'plot'):
+        plt.tight_layout()
+        plt.show()
     
     print(f"\nАнализ проведен для {len(p_values)} значений p от {p_values[0]:.2f} до {p_values[-1]:.2f}")
     print(f"Количество экспериментов для каждого p: {experiments_count_p}")
@@ -214,6 +315,12 @@ def execute_analysis():
     print("\nСохраненные значения для 100 экспериментов:")
     print(f"Количество орлов в каждом эксперименте: {symmetric_results['results'][:10]}...")
     print(f"Всего сохранено: {len(symmetric_results['results'])} значений")
+    
+    if profiler is not None:
+        profiler.stop()
+        profiler.to_json(profile_path)
+        print(f"\nПрофиль: {profiler.summary()}")
+        print(f"Отчет сохранен в файл '{profile_path}'")
 
 if __name__ == "__main__":
-    execute_analysis()
+    execute_analysis(profile_path=os.environ.get('COINLAB_PROFILE'))
@@ -1,17 +1,16 @@
-import random
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
-random.seed(42)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from coinlab import FlipSource, HeadCountHistogram, horizon_sweep
 
-def simulate_coin_flips(n_flips=100, p=0.5):
-    results = []
-    for _ in range(n_flips):
-        if random.random() < p:
-            results.append('H')
-        else:
-            results.append('T')
-    return results
+FLIPS = FlipSource(seed=42)
+
+def simulate_experiments_flips(n_experiments, n_flips=100, p=0.5):
+    for flips in FLIPS.flip_lists(n_experiments, n_flips, p):
+        yield ['H' if flip else 'T' for flip in flips]
 
 
 def analyze_series(flips):
@@ -36,8 +35,7 @@ def run_experiments(n_experiments=10000, n_flips=100, p=0.5):
     max_series_lengths = []
     has_5_series_flags = []
 
-    for _ in range(n_experiments):
-        flips = simulate_coin_flips(n_flips, p)
+    for flips in simulate_experiments_flips(n_experiments, n_flips, p):
         heads_count = flips.count('H')
         max_series, has_5_series = analyze_series(flips)
 
@@ -53,24 +51,23 @@ def calculate_interval_probabilities(heads_counts):
                  (50, 60), (60, 70), (70, 80), (80, 90), (90, 101)]
 
     probabilities = {}
-    total = len(heads_counts)
+    hist = HeadCountHistogram.from_counts(heads_counts)
 
-    for i, (start, end) in enumerate(intervals):
-        count = sum(1 for h in heads_counts if start <= h < end)
-        probabilities[f"[{start},{end - 1}]"] = count / total
+    for start, end in intervals:
+        probabilities[f"[{start},{end - 1}]"] = hist.prob_between(start, end)
 
     return probabilities
 
 
 def calculate_prediction_interval(heads_counts, confidence=0.95):
-    heads_counts_sorted = sorted(heads_counts)
-    n = len(heads_counts_sorted)
+    hist = HeadCountHistogram.from_counts(heads_counts)
+    n = hist.total
 
     lower_idx = int((1 - confidence) / 2 * n)
-    upper_idx = int((1 + confidence) / 2 * n)
+    upper_idx = min(int((1 + confidence) / 2 * n), n - 1)
 
-    lower_bound = heads_counts_sorted[lower_idx]
-    upper_bound = heads_counts_sorted[upper_idx]
+    lower_bound = hist.sorted_value(lower_idx)
+    upper_bound = hist.sorted_value(upper_idx)
 
     return lower_bound, upper_bound, upper_bound - lower_bound
 
@@ -88,7 +85,7 @@ def main():
     avg_heads = np.mean(heads_counts)
     print(f"1. Среднее число орлов: {avg_heads:.2f}")
 
-    prob_more_than_60 = sum(1 for h in heads_counts if h > 60) / n_experiments
+    prob_more_than_60 = HeadCountHistogram.from_counts(heads_counts, n_flips).prob_greater(60)
     print(f"2. Вероятность получить >60 орлов: {prob_more_than_60:.4f}")
 
     interval_probs = calculate_interval_probabilities(heads_counts)
@@ -109,6 +106,9 @@ def main():
     print("\nНесимметричная монета: ")
     analyze_asymmetric_coin()
 
+    print("\nЗависимость от числа бросков: ")
+    analyze_horizons()
+
 
 def analyze_asymmetric_coin():
     n_experiments = 1000
@@ -163,5 +163,39 @@ def analyze_asymmetric_coin():
     plt.show()
 
 
+def analyze_horizons(n_experiments=10000, p=0.5):
+    results = horizon_sweep(range(10, 1001, 10), n_experiments, p, generate=FLIPS)
+    n_flips = results['n_tosses']
+
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 10))
+
+    ax1.plot(n_flips, results['prob_gt_60'], 'b-', linewidth=2)
+    ax1.set_xlabel('Число бросков (n)')
+    ax1.set_ylabel('Вероятность')
+    ax1.set_title('Вероятность получить больше 60% орлов')
+    ax1.grid(True)
+
+    ax2.plot(n_flips, results['interval_width'], 'r-', linewidth=2)
+    ax2.set_xlabel('Число бросков (n)')
+    ax2.set_ylabel('Ширина интервала')
+    ax2.set_title('Ширина 95% интервала')
+    ax2.grid(True)
+
+    ax3.plot(n_flips, results['prob_series_5'], 'g-', linewidth=2)
+    ax3.set_xlabel('Число бросков (n)')
+    ax3.set_ylabel('Вероятность')
+    ax3.set_title('Вероятность серии из 5 орлов подряд')
+    ax3.grid(True)
+
+    ax4.plot(n_flips, results['mean_max_series'], 'm-', linewidth=2)
+    ax4.set_xlabel('Число бросков (n)')
+    ax4.set_ylabel('Длина серии')
+    ax4.set_title('Средняя длина максимальной серии орлов')
+    ax4.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,11 @@
-import random
+import os
+import sys
 import matplotlib.pyplot as plt
 
-random.seed(42)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from coinlab import FlipSource, HeadCountHistogram
+
+FLIPS = FlipSource(seed=42)
 
 TEST_AMOUNT = 1000
 FLIP_AMOUNT = 100
@@ -11,8 +15,7 @@ PROBABILITY_OF_HEADS_DELTA = 0.05
 
 
 def do_all_tests(p):
-    options = [0, 1]
-    probabilities = [1-p, p]
+    flips = FLIPS(TEST_AMOUNT, FLIP_AMOUNT, p)
     total = 0
     heads_more_than_60 = 0
     heads_sum = []
@@ -23,7 +26,7 @@ def do_all_tests(p):
         seria_count = 0
         seria_here = False
         for j in range(FLIP_AMOUNT):
-            coin = random.choices(options, weights=probabilities, k=1)[0]
+            coin = int(flips[i, j])
             heads += coin
             if coin == 1:
                 seria_count += 1
@@ -51,20 +54,8 @@ def count_chances_in_intervals(heads_sum):
     return intervals
 
 def find_interval_with_prob_heads (heads_sum, p):
-    def_interval = [int(p * 100), int(p * 100)]
-    while True:
-        if def_interval[0] < 0 or def_interval[1] > 100:
-            break
-        am = 0.0
-        for i in range(len(heads_sum)):
-            if heads_sum[i] >= def_interval[0] and heads_sum[i] <= def_interval[1]:
-                am += 1.0
-        if am / TEST_AMOUNT >= 0.95:
-            break
-        else:
-            def_interval[0] -= 1
-            def_interval[1] += 1
-    return def_interval
+    hist = HeadCountHistogram.from_counts(heads_sum, FLIP_AMOUNT)
+    return list(hist.shortest_interval(PROBABILITY_OF_HEADS_IN_INTERVAL))
 
 
 def if_heads_prob_eq_p():
@@ -81,14 +72,13 @@ def if_heads_prob_eq_p():
     plt.show()
 
 def heads_prediction_interval_width(p):
-    options = [0, 1]
-    probabilities = [1-p, p]
+    flips = FLIPS(TEST_AMOUNT, FLIP_AMOUNT, p)
     total = 0
     heads_sum = []
     for test in range(TEST_AMOUNT):
         heads = 0
         for flip in range(FLIP_AMOUNT):
-            coin = random.choices(options, weights=probabilities, k=1)[0]
+            coin = int(flips[test, flip])
             heads += coin
         total += heads
         heads_sum.append(heads)
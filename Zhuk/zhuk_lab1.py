@@ -1,14 +1,23 @@
-import random
+import os
+import sys
+import numpy as np
 import matplotlib.pyplot as plt
 
-def coin_exp(tosses = 100, p = 0.5):
-    res = []
-    for i in range(tosses):
-        if random.random() < p:
-            res.append("О")
-        else:
-            res.append("Р")
-    return res
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from coinlab import BackgroundSample, BackgroundTask, FlipSource, HeadCountHistogram, run_stats, sample_max_run, sweep_p_coupled
+
+FLIPS = FlipSource()
+P_GRID = [round(0.05 * i, 2) for i in range(21)]
+GRAPH_EXP_COUNT = 10000
+PRECOMPUTED = {}
+
+def precompute_graphs():
+    PRECOMPUTED['curves'] = BackgroundTask(sweep_p_coupled, P_GRID, GRAPH_EXP_COUNT)
+
+def graph_curves():
+    if 'curves' not in PRECOMPUTED:
+        precompute_graphs()
+    return PRECOMPUTED['curves'].result()
 
 def print_menu():
     print("Какой эксперимент вы хотите выполнить?")
@@ -28,56 +37,30 @@ def first_exp(ress, exp_count):
     print(f"\nСреднее количество орлов при количестве экспериментов {exp_count}: {sum(ress) / len(ress)}")
 
 def second_exp(ress, exp_count):
-    count_60 = 0
-    for item in ress:
-        if item > 60:
-            count_60 += 1
-    print(f"\nС такой вероятностью можно получить число орлов больше 60 при количестве экспериментов {exp_count}: {count_60 / len(ress)}")
+    hist = HeadCountHistogram.from_counts(ress)
+    print(f"\nС такой вероятностью можно получить число орлов больше 60 при количестве экспериментов {exp_count}: {hist.prob_greater(60)}")
 
 def third_exp(ress, exp_count):
     intervals = [(0, 10), (10, 20), (20, 30), (30, 40), (40, 50), (50, 60), (60, 70), (70, 80), (80, 90), (90, 100)]
+    hist = HeadCountHistogram.from_counts(ress)
     ans = {}
     for interval in intervals:
-        count_in_int = 0
-        for item in ress:
-            if interval[0] <= item < interval[1]:
-                count_in_int += 1
-        ans[interval] = count_in_int / len(ress)
+        ans[interval] = hist.prob_between(interval[0], interval[1])
     print(f"\nС такой вероятностью выпадет число орлов соответствующее этим интервалам при количестве экспериментов {exp_count}")
     for key in ans:
         print(f"{key}: {ans[key]:.6f}")
 
 def fourth_exp(ress, exp_count, p = 0.5):
-    left_ran, right_ran = p * 100 + 1, p * 100
-    probabil = 0.5
-    while probabil < 0.935:
-        left_ran -= 1
-        right_ran += 1
-        counter = 0
-        for item in ress:
-            if left_ran <= item <= right_ran:
-                counter += 1
-        probabil = counter / len(ress)
+    hist = HeadCountHistogram.from_counts(ress)
+    left_ran, right_ran = hist.shortest_interval(0.95)
+    probabil = hist.prob_between(left_ran, right_ran + 1)
     print(f"Внутри этого интервала с вероятностью {probabil} стоит ожидать значение числа орлов при количестве экспериментов {exp_count} и p = {p}:")
-    print(f"[{left_ran}, {right_ran})")
+    print(f"[{left_ran}, {right_ran}]")
     return (left_ran, right_ran)
 
 def sixth_exp():
-    def max_len_seri(p):
-        max_len = 0
-        for exp in range(100000):
-            res = coin_exp(p = p)
-            current_len = 0
-            for item in res:
-                if item == "О":
-                    current_len += 1
-                else:
-                    if current_len > max_len:
-                        max_len = current_len
-                    current_len = 0
-            if current_len > max_len:
-                max_len = current_len
-        return max_len
+    def max_len_seri(p, exp_count=100000):
+        return int(sample_max_run(100, p, exp_count, rng=FLIPS.rng))
     print("1. Ожидаемое число орлов от p")
     print("2. Ширина предсказательного интервала от p")
     print("3. Вероятность наличия серии из 5 орлов")
@@ -86,11 +69,8 @@ def sixth_exp():
     answer = input("Введите номер для графика: ")
     while answer != " ":
         if answer == "1":
-            x = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
-            y = []
-            for item in x:
-                result, trash = new_exps(p=item)
-                y.append(sum(result) / len(result))
+            x = P_GRID[::2]
+            y = graph_curves()['mean_heads'][::2]
             plt.figure(figsize=(8, 6))
             plt.plot(x, y, 'bo-', linewidth=2, markersize=6)
             plt.title('Зависимость ожидаемого числа орлов от вероятности p', fontsize=14)
@@ -99,12 +79,8 @@ def sixth_exp():
             plt.grid(True, alpha=0.4, linestyle='-')
             plt.show()
         elif answer == "2":
-            x = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
-            y = []
-            for item in x:
-                result, trash = new_exps(p=item)
-                an = fourth_exp(result, exp_count=len(result), p=item)
-                y.append(an[1] - an[0])
+            x = P_GRID[::2]
+            y = graph_curves()['shortest_interval_width'][::2]
             plt.figure(figsize=(12, 8))
             plt.bar(x, y, width=0.08, color='skyblue', edgecolor='black', alpha=0.8)
             plt.title('Ширина 95% доверительного интервала для числа орлов\nв зависимости от вероятности p',
@@ -121,11 +97,8 @@ def sixth_exp():
             plt.tight_layout()
             plt.show()
         elif answer == "3":
-            x = [0.0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1.0]
-            y = []
-            for item in x:
-                result, suc = new_exps(p = item)
-                y.append(suc)
+            x = P_GRID
+            y = graph_curves()['prob_series_5']
             plt.figure(figsize=(8, 6))
             plt.plot(x, y, 'bo-', linewidth=2, markersize=6)
             plt.title("Вероятность выпадения хотя бы 1 серии из 5 орлов\nв зависимости от вероятности p",
@@ -157,32 +130,21 @@ def sixth_exp():
 
 
 def new_exps(exp_count = 10000, p = 0.5):
-    result = []
-    sucesses = 0
-    for i in range(exp_count):
-        has_series, current_serie = False, 0
-        mini_res, eagles_count = coin_exp(p = p), 0
-        for item in mini_res:
-            if item == "О":
-                current_serie += 1
-                eagles_count += 1
-            else:
-                current_serie = 0
-            if not has_series and current_serie >= 5:
-                has_series = True
-        result.append(eagles_count)
-        if has_series:
-            sucesses += 1
-    return result, sucesses / exp_count
+    flips = FLIPS(exp_count, 100, p)
+    return np.sum(flips, axis = 1), np.mean(run_stats(flips, 5).has_run)
 
 
 def main():
     print("Введите начальное количество экспериментов, которое вы хотите делать с монеткой (100, 1000, ...):")
     exp_count = int(input())
-    result, suc = new_exps(exp_count)
+    sample = BackgroundSample(flip_source = FLIPS)
+    sample.extend_to(exp_count)
+    precompute_graphs()
 
     answer = print_menu()
     while answer != "0" or answer != "ноль":
+        if answer in ("1", "2", "3", "4", "5"):
+            result, suc = sample.result()
         if answer == "1":
             first_exp(ress = result, exp_count = exp_count)
         elif answer == "2":
@@ -197,13 +159,13 @@ def main():
             sixth_exp()
         elif answer == "7":
             exp_count = int(input("Введите новое число экспериментов: "))
+            sample.extend_to(exp_count)
         if answer != "6" and answer != "7":
             answer = input("\nЖелаете продолжить? (y/n): ")
             if answer != "y":
                 break
 
         answer = print_menu()
-        result, suc = new_exps(exp_count)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+from coinlab.runs import RunScanner, RunStats, run_boundaries, run_stats
+from coinlab.packed import PackedTosses
+from coinlab.analytic import (analyze_analytic, head_count_pmf, longest_run_cdf, max_run_over_experiments_cdf,
+                              sample_max_run, sweep_analytic)
+from coinlab.streaming import StreamingAccumulator, stream_experiments, stream_long_experiments
+from coinlab.histogram import HeadCountHistogram, quantile_intervals, shortest_intervals
+from coinlab.sweep import SweepAccumulator, sweep_p, sweep_p_coupled
+from coinlab.parallel import parallel_sweep
+from coinlab.adaptive import adaptive_estimate, wilson_interval
+from coinlab.importance import importance_interval_prob, importance_tail_probs
+from coinlab.rng import FlipSource, ThreadedFlipSource
+from coinlab.cache import ResultCache
+from coinlab.background import BackgroundSample, BackgroundTask
+from coinlab.refine import refine_sweep
+from coinlab.lazy import LazyTosses, arrange_heads
+from coinlab.rle import RunLengthTosses
+from coinlab.profiling import Profiler
+from coinlab.patterns import PatternAutomaton
+from coinlab.variance import sample_questions
+from coinlab.horizon import horizon_sweep
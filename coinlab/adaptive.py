@@ -0,0 +1,92 @@
+from statistics import NormalDist
+
+import numpy as np
+
+from coinlab.streaming import StreamingAccumulator
+
+
+DEFAULT_TARGETS = {
+    'mean_heads': 0.05,
+    'prob_gt_60': 0.002,
+    'prob_series_5': 0.005,
+    'mean_max_series': 0.02,
+}
+
+
+def z_value(confidence=0.95):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes, n, confidence=0.95):
+    z = z_value(confidence)
+    phat = successes / n
+    denominator = 1 + z ** 2 / n
+    centre = (phat + z ** 2 / (2 * n)) / denominator
+    spread = z * np.sqrt(phat * (1 - phat) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return centre - spread, centre + spread
+
+
+def normal_interval(values, weights, confidence=0.95):
+    """Normal-approximation interval for the mean of a histogram (weights over values)."""
+    n = weights.sum()
+    mean = np.dot(values, weights) / n
+    variance = np.dot((values - mean) ** 2, weights) / max(n - 1, 1)
+    spread = z_value(confidence) * np.sqrt(variance / n)
+    return mean, (mean - spread, mean + spread)
+
+
+def current_estimate(accumulator, name, confidence=0.95, threshold=60):
+    """(estimate, interval) of one lab-1 quantity from the accumulator's sufficient statistics."""
+    n = accumulator.n_experiments
+    values = np.arange(accumulator.n_tosses + 1)
+    if name == 'mean_heads':
+        return normal_interval(values, accumulator.heads.counts, confidence)
+    if name == 'mean_max_series':
+        return normal_interval(values, accumulator.max_run_hist, confidence)
+    if name == 'prob_gt_60':
+        successes = accumulator.heads.count_between(threshold + 1, accumulator.n_tosses + 1)
+    elif name == 'prob_series_5':
+        successes = accumulator.series_count
+    else:
+        raise ValueError(f"Unknown estimate: {name}")
+    return successes / n, wilson_interval(successes, n, confidence)
+
+
+def adaptive_estimate(p=0.5, targets=None, n_tosses=100, batch_size=1000, max_experiments=10 ** 7,
+                      confidence=0.95, threshold=60, series_length=5, generate=None, rng=None):
+    """Simulate in batches until every estimate's CI half-width is within its target.
+
+    An estimate is frozen (value, interval and sample count) at the first batch
+    where it is tight enough; simulation continues only while some are not.
+    """
+    targets = dict(DEFAULT_TARGETS if targets is None else targets)
+    if generate is None:
+        rng = np.random.default_rng(rng)
+        generate = lambda rows, n, p: rng.random((rows, n)) < p
+
+    accumulator = StreamingAccumulator(n_tosses, series_length)
+    report = {}
+    while targets and accumulator.n_experiments < max_experiments:
+        rows = min(batch_size, max_experiments - accumulator.n_experiments)
+        accumulator.update(generate(rows, n_tosses, p))
+        for name, target in list(targets.items()):
+            estimate, (lower, upper) = current_estimate(accumulator, name, confidence, threshold)
+            if (upper - lower) / 2 <= target:
+                report[name] = _entry(estimate, lower, upper, target, accumulator.n_experiments, True)
+                del targets[name]
+
+    for name, target in targets.items():
+        estimate, (lower, upper) = current_estimate(accumulator, name, confidence, threshold)
+        report[name] = _entry(estimate, lower, upper, target, accumulator.n_experiments, False)
+    return report
+
+
+def _entry(estimate, lower, upper, target, n_experiments, converged):
+    return {
+        'estimate': estimate,
+        'interval': (lower, upper),
+        'half_width': (upper - lower) / 2,
+        'target': target,
+        'n_experiments': n_experiments,
+        'converged': converged,
+    }
@@ -0,0 +1,121 @@
+import numpy as np
+from scipy.stats import binom
+
+from coinlab.histogram import shortest_intervals
+
+
+P_BLOCK = 64
+HISTORY_BYTES = 64 << 20
+
+
+def head_count_pmf(n_tosses, p):
+    """P(heads = h) for h = 0..n_tosses; rows follow p when p is an array."""
+    p = np.asarray(p, dtype=float)
+    return binom.pmf(np.arange(n_tosses + 1), n_tosses, p[..., None])
+
+
+def longest_run_cdf(n_tosses, p):
+    """P(longest run of heads <= r) for r = 0..n_tosses; rows follow p when p is an array.
+
+    Column r holds the probability that the run-length Markov chain never reaches
+    state r + 1, i.e. Q_m = Q_{m-1} - q p^k Q_{m-k-1} with k = r + 1, Q_m = 1 for m < k
+    and Q_k = 1 - p^k.
+
+    The recurrence keeps n_tosses + 1 rows of history per (p, column). Columns are
+    independent, so blocks of p and of columns are sized to keep the history within
+    HISTORY_BYTES for any n_tosses (down to one p and a few columns per block).
+    """
+    p = np.asarray(p, dtype=float)
+    flat_p = np.atleast_1d(p).ravel()
+    n_columns = n_tosses + 1
+    cdf = np.empty((flat_p.size, n_columns))
+    column_bytes = 8 * (n_tosses + 1)
+    column_block = int(np.clip(HISTORY_BYTES // column_bytes, 1, n_columns))
+    p_block = int(np.clip(HISTORY_BYTES // (column_bytes * column_block), 1, P_BLOCK))
+    for start in range(0, flat_p.size, p_block):
+        for first in range(0, n_columns, column_block):
+            k = np.arange(first + 1, min(first + column_block, n_columns) + 1)
+            cdf[start:start + p_block, first:first + k.size] = _run_free_probabilities(
+                n_tosses, flat_p[start:start + p_block], k)
+    return cdf.reshape(p.shape + (n_columns,))
+
+
+def _run_free_probabilities(n_tosses, p, k):
+    """P(no run of k heads in n_tosses) for every p (rows) and run length k (columns)."""
+    p = p[:, None]
+    q = 1 - p
+    p_k = p ** k
+    columns = np.arange(k.size)
+
+    history = np.ones((n_tosses + 1, p.shape[0], k.size))
+    for m in range(1, n_tosses + 1):
+        lag = m - k - 1
+        lagged = history[np.maximum(lag, 0), :, columns].T
+        step = np.where(lag >= 0, q * p_k * lagged, np.where(lag == -1, p_k, 0.0))
+        history[m] = history[m - 1] - step
+    return np.clip(history[n_tosses], 0.0, 1.0)
+
+
+def max_run_over_experiments_cdf(n_tosses, p, n_experiments):
+    """P(largest longest run across n_experiments independent experiments <= r), r = 0..n_tosses.
+
+    The experiments are independent, so this is longest_run_cdf ** n_experiments.
+    """
+    return longest_run_cdf(n_tosses, p) ** n_experiments
+
+
+def sample_max_run(n_tosses, p, n_experiments, size=None, rng=None):
+    """Draws of the largest longest run across n_experiments, by inverting the CDF above."""
+    rng = np.random.default_rng(rng)
+    cdf = max_run_over_experiments_cdf(n_tosses, float(p), n_experiments)
+    cdf[-1] = 1.0
+    return np.searchsorted(cdf, rng.random(size), side='left')
+
+
+def prediction_interval(n_tosses, p, level=0.95):
+    tail = (1 - level) / 2
+    lower = binom.ppf(tail, n_tosses, p)
+    upper = binom.ppf(1 - tail, n_tosses, p)
+    return lower, upper
+
+
+def analyze_analytic(n_tosses=100, p=0.5, series_length=5, threshold=60, bin_width=10, level=0.95):
+    """Exact answers to the lab-1 questions, keyed like CoinExperiment.analyze_experiments."""
+    pmf = head_count_pmf(n_tosses, p)
+    run_cdf = longest_run_cdf(n_tosses, p)
+
+    bins = np.arange(0, n_tosses + 1, bin_width)
+    bin_probs = [pmf[bins[i]:bins[i + 1]].sum() for i in range(len(bins) - 2)]
+    bin_probs.append(pmf[bins[-2]:].sum())
+
+    lower, upper = prediction_interval(n_tosses, p, level)
+
+    return {
+        'mean_heads': n_tosses * p,
+        'prob_gt_60': binom.sf(threshold, n_tosses, p),
+        'bin_probs': bin_probs,
+        'confidence_interval': (lower, upper),
+        'interval_width': upper - lower,
+        'prob_series_5': 1 - run_cdf[series_length - 1],
+        'mean_max_series': np.sum(1 - run_cdf[:-1]),
+        'results': None,
+        'all_tosses': None,
+        'head_count_pmf': pmf,
+        'max_run_pmf': np.diff(run_cdf, prepend=0.0),
+    }
+
+
+def sweep_analytic(n_tosses, p_values, series_length=5, level=0.95):
+    """The four item-6 curves for every p at once."""
+    p_values = np.asarray(p_values, dtype=float)
+    run_cdf = longest_run_cdf(n_tosses, p_values)
+    lower, upper = prediction_interval(n_tosses, p_values, level)
+    shortest_lower, shortest_upper = shortest_intervals(head_count_pmf(n_tosses, p_values), level)
+    return {
+        'p_values': p_values,
+        'mean_heads': n_tosses * p_values,
+        'interval_width': upper - lower,
+        'shortest_interval_width': shortest_upper - shortest_lower,
+        'prob_series_5': 1 - run_cdf[:, series_length - 1],
+        'mean_max_series': np.sum(1 - run_cdf[:, :-1], axis=1),
+    }
@@ -0,0 +1,93 @@
+import threading
+
+import numpy as np
+
+from coinlab.rng import FlipSource
+from coinlab.runs import run_stats
+
+
+class BackgroundSample:
+    """Head counts and run-of-k flags for one p, simulated on a worker thread.
+
+    extend_to() only raises (or lowers) the target: experiments already simulated
+    are kept, so growing the sample tops it up instead of regenerating it.
+    """
+
+    def __init__(self, n_tosses=100, p=0.5, series_length=5, flip_source=None, chunk_rows=2000):
+        self.n_tosses = n_tosses
+        self.p = p
+        self.series_length = series_length
+        self.flip_source = flip_source or FlipSource()
+        self.chunk_rows = chunk_rows
+        self.target = 0
+        self._counts = []
+        self._has_run = []
+        self._size = 0
+        self._running = False
+        self._changed = threading.Condition()
+
+    def extend_to(self, n_experiments):
+        with self._changed:
+            self.target = n_experiments
+            if not self._running and self._size < self.target:
+                self._running = True
+                threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._changed:
+                missing = self.target - self._size
+                if missing <= 0:
+                    self._running = False
+                    self._changed.notify_all()
+                    return
+            tosses = self.flip_source(min(self.chunk_rows, missing), self.n_tosses, self.p)
+            counts = np.sum(tosses, axis=1)
+            has_run = run_stats(tosses, self.series_length).has_run
+            with self._changed:
+                self._counts.append(counts)
+                self._has_run.append(has_run)
+                self._size += len(counts)
+                self._changed.notify_all()
+
+    @property
+    def ready(self):
+        with self._changed:
+            return self._size >= self.target
+
+    def result(self):
+        """(head counts, share of experiments with a run) for the current target; waits if needed."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._size >= self.target)
+            if len(self._counts) > 1:
+                self._counts = [np.concatenate(self._counts)]
+                self._has_run = [np.concatenate(self._has_run)]
+            counts = self._counts[0][:self.target] if self._counts else np.empty(0, dtype=np.int64)
+            has_run = self._has_run[0][:self.target] if self._has_run else np.empty(0, dtype=bool)
+        return counts, np.mean(has_run) if len(has_run) else 0.0
+
+
+class BackgroundTask:
+    """Runs function(*args, **kwargs) on a daemon thread; result() waits for it."""
+
+    def __init__(self, function, *args, **kwargs):
+        self._value = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(function, args, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, function, args, kwargs):
+        try:
+            self._value = function(*args, **kwargs)
+        except BaseException as error:
+            self._error = error
+
+    @property
+    def ready(self):
+        return not self._thread.is_alive()
+
+    def result(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._value
@@ -0,0 +1,218 @@
+"""Cross-implementation benchmark for the lab-1 coin simulators.
+
+    python -m coinlab.bench --experiments 1000 10000 --p 0.5 0.3 [--json report.json]
+
+Every implementation runs headless in its own subprocess (plotting stubbed out),
+so wall time and peak RSS are measured in isolation. Q1-Q5 estimates are checked
+against the exact answers from coinlab.analytic.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from coinlab.profiling import peak_rss_bytes
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_TOSSES = 100
+BIN_EDGES = list(range(0, 101, 10))
+
+IMPLEMENTATIONS = {
+    'Sinyakov': "Sinyakov/First_Lab.py",
+    'Korzun': "Korzun/lab1.py",
+    'Yanushkevich': "Yanushkevich/Lab 1/lab 1.py",
+    'Sakharuk': "Sakharuk/lab.py",
+    'Voronenko': "Voronenko/lab1/main.py",
+    'Zhuk': "Zhuk/zhuk_lab1.py",
+}
+
+
+def load(name):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.show = lambda *args, **kwargs: None
+    plt.savefig = lambda *args, **kwargs: None
+
+    path = os.path.join(ROOT, IMPLEMENTATIONS[name])
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(f"bench_{name.lower()}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def summarize(heads, has_series, interval):
+    from coinlab.histogram import HeadCountHistogram
+    histogram = HeadCountHistogram.from_counts(heads, N_TOSSES)
+    return {
+        'mean_heads': float(np.mean(heads)),
+        'prob_gt_60': float(histogram.prob_greater(60)),
+        'bin_probs': [float(x) for x in histogram.bin_probs(BIN_EDGES)],
+        'interval': [int(interval[0]), int(interval[1])],
+        'prob_series_5': float(np.mean(has_series)),
+    }
+
+
+def run_sinyakov(module, n_experiments, p):
+    result = module.CoinExperiment(N_TOSSES, n_experiments).analyze_experiments(p)
+    stats = module.run_stats(result['all_tosses'], 5)
+    return summarize(result['results'], stats.has_run, result['confidence_interval'])
+
+
+def run_korzun(module, n_experiments, p):
+    heads, has_series = module.run_experiments(n_experiments, N_TOSSES, p)
+    interval = np.percentile(heads, 2.5), np.percentile(heads, 97.5)
+    return summarize(heads, has_series, interval)
+
+
+def run_yanushkevich(module, n_experiments, p):
+    module.TEST_AMOUNT = n_experiments
+    heads, total, more_than_60, seria_tests, max_seria = module.do_all_tests(p)
+    interval = module.find_interval_with_prob_heads(heads, p)
+    return summarize(heads, [1] * int(seria_tests) + [0] * (n_experiments - int(seria_tests)), interval)
+
+
+def run_sakharuk(module, n_experiments, p):
+    successful, heads = module.multipleExp100(N_TOSSES, n_experiments, p)
+    left, right = module.probability95prc(heads, n_experiments, p)
+    return summarize(heads, [1] * successful + [0] * (n_experiments - successful), (left, right - 1))
+
+
+def run_voronenko(module, n_experiments, p):
+    heads, max_series, has_series = module.run_experiments(n_experiments, N_TOSSES, p)
+    lower, upper, width = module.calculate_prediction_interval(heads, 0.95)
+    return summarize(heads, has_series, (lower, upper))
+
+
+def run_zhuk(module, n_experiments, p):
+    heads, share = module.new_exps(n_experiments, p)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interval = module.fourth_exp(heads, n_experiments, p)
+    hits = int(round(share * n_experiments))
+    return summarize(heads, [1] * hits + [0] * (n_experiments - hits), interval)
+
+
+RUNNERS = {
+    'Sinyakov': run_sinyakov,
+    'Korzun': run_korzun,
+    'Yanushkevich': run_yanushkevich,
+    'Sakharuk': run_sakharuk,
+    'Voronenko': run_voronenko,
+    'Zhuk': run_zhuk,
+}
+
+
+def worker(name, n_experiments, p):
+    """Runs inside the subprocess: import, time one run, report JSON on stdout."""
+    module = load(name)
+    baseline = peak_rss_bytes()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        estimates = RUNNERS[name](module, n_experiments, p)
+    wall = time.perf_counter() - start
+    peak = peak_rss_bytes()
+    report = {
+        'implementation': name,
+        'n_experiments': n_experiments,
+        'p': p,
+        'wall_time': wall,
+        'flips_per_sec': n_experiments * N_TOSSES / wall if wall > 0 else float('inf'),
+        'peak_rss': peak,
+        'peak_rss_growth': peak - baseline if peak is not None else None,
+        'estimates': estimates,
+    }
+    print(json.dumps(report))
+
+
+def check_agreement(estimates, n_experiments, p, z=4.0):
+    """Names of the Q1-Q5 estimates that miss the exact value by more than z standard errors."""
+    from coinlab.analytic import analyze_analytic
+    from coinlab.histogram import shortest_intervals
+    exact = analyze_analytic(N_TOSSES, p)
+
+    def proportion_ok(estimate, truth):
+        se = np.sqrt(truth * (1 - truth) / n_experiments)
+        return abs(estimate - truth) <= z * se + 1.0 / n_experiments
+
+    failures = []
+    se_mean = np.sqrt(N_TOSSES * p * (1 - p) / n_experiments)
+    if abs(estimates['mean_heads'] - exact['mean_heads']) > z * se_mean + 1e-9:
+        failures.append('Q1')
+    if not proportion_ok(estimates['prob_gt_60'], exact['prob_gt_60']):
+        failures.append('Q2')
+    if not all(proportion_ok(e, t) for e, t in zip(estimates['bin_probs'], exact['bin_probs'])):
+        failures.append('Q3')
+    shortest_lower, shortest_upper = shortest_intervals(exact['head_count_pmf'], 0.95)
+    widths = (exact['interval_width'], shortest_upper[0] - shortest_lower[0])
+    width = estimates['interval'][1] - estimates['interval'][0]
+    if not min(widths) - 3 <= width <= max(widths) + 3:
+        failures.append('Q4')
+    if not proportion_ok(estimates['prob_series_5'], exact['prob_series_5']):
+        failures.append('Q5')
+    return failures
+
+
+def run_benchmark(names, experiment_counts, p_values, timeout=None):
+    """One subprocess per (implementation, n_experiments, p) point of the grid."""
+    reports = []
+    for n_experiments, p in itertools.product(experiment_counts, p_values):
+        for name in names:
+            command = [sys.executable, "-m", "coinlab.bench", "--worker", name,
+                       "--experiments", str(n_experiments), "--p", str(p)]
+            env = dict(os.environ, MPLBACKEND="Agg")
+            completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout)
+            if completed.returncode != 0:
+                reports.append({'implementation': name, 'p': p, 'n_experiments': n_experiments,
+                                'error': completed.stderr.strip().splitlines()[-1:]})
+                continue
+            report = json.loads(completed.stdout.strip().splitlines()[-1])
+            report['disagreements'] = check_agreement(report['estimates'], n_experiments, p)
+            reports.append(report)
+    return reports
+
+
+def print_table(reports):
+    print(f"{'implementation':<14}{'N':>8}{'p':>6}{'wall, s':>10}{'flips/s':>14}{'peak RSS, MiB':>15}  agreement")
+    for report in reports:
+        if 'error' in report:
+            print(f"{report['implementation']:<14}{report['n_experiments']:>8}{report['p']:>6}  failed: {' '.join(report['error'])}")
+            continue
+        agreement = "ok" if not report['disagreements'] else "off: " + ", ".join(report['disagreements'])
+        rss = f"{report['peak_rss'] / 2 ** 20:>15.1f}" if report['peak_rss'] is not None else f"{'n/a':>15}"
+        print(f"{report['implementation']:<14}{report['n_experiments']:>8}{report['p']:>6}{report['wall_time']:>10.3f}"
+              f"{report['flips_per_sec']:>14.3g}{rss}  {agreement}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, nargs="+", default=[2000])
+    parser.add_argument("--p", type=float, nargs="+", default=[0.5, 0.3])
+    parser.add_argument("--only", nargs="+", choices=sorted(IMPLEMENTATIONS), default=sorted(IMPLEMENTATIONS))
+    parser.add_argument("--json", help="also write the full report to this file")
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--worker", choices=sorted(IMPLEMENTATIONS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker, args.experiments[0], args.p[0])
+        return
+
+    reports = run_benchmark(args.only, args.experiments, args.p, args.timeout)
+    print_table(reports)
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(reports, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "coinlab")
+DEFAULT_MAX_BYTES = 256 << 20
+
+
+def code_version(sources=()):
+    """Hash of the coinlab sources, any extra generator sources and the NumPy version."""
+    package = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py")))
+    digest = hashlib.sha256(np.__version__.encode())
+    for path in package + [os.path.abspath(path) for path in sources]:
+        with open(path, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def rng_state(flip_source=None):
+    """JSON snapshot of the stream a simulation draws from (global np.random or a FlipSource)."""
+    if flip_source is not None:
+        return json.dumps(flip_source.rng.bit_generator.state, sort_keys=True, default=int)
+    name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    return json.dumps([name, keys.tolist(), pos, has_gauss, cached_gaussian])
+
+
+def restore_rng_state(state, flip_source=None):
+    if flip_source is not None:
+        flip_source.rng.bit_generator.state = json.loads(state)
+        return
+    name, keys, pos, has_gauss, cached_gaussian = json.loads(state)
+    np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached_gaussian))
+
+
+class ResultCache:
+    """Content-addressed .npz cache with size-bounded LRU eviction.
+
+    Entries are keyed by (name, params, code version). Caches opened with different
+    sources share the directory, so entries of other versions are left alone and age
+    out through the LRU like any other. Files may vanish under a concurrent eviction;
+    that is treated as a miss.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, sources=()):
+        self.directory = directory or os.environ.get("COINLAB_CACHE", DEFAULT_DIRECTORY)
+        self.max_bytes = max_bytes
+        self.version = code_version(sources)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, name, params):
+        payload = json.dumps({'name': name, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, name, params):
+        return os.path.join(self.directory, f"{self.version}-{self.key(name, params)}.npz")
+
+    def entries(self):
+        """Finished entries; other processes' in-flight .tmp.npz files are not included."""
+        return [path for path in glob.glob(os.path.join(self.directory, "*.npz")) if not path.endswith(".tmp.npz")]
+
+    def get(self, name, params):
+        path = self.path(name, params)
+        try:
+            with np.load(path) as data:
+                entry = {key: data[key] for key in data.files}
+            os.utime(path)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, name, params, arrays):
+        path = self.path(name, params)
+        temporary = path[:-len(".npz")] + f".{os.getpid()}.tmp.npz"
+        np.savez_compressed(temporary, **arrays)
+        os.replace(temporary, path)
+        self.evict()
+
+    def cached(self, name, params, compute):
+        entry = self.get(name, params)
+        if entry is None:
+            entry = compute()
+            self.put(name, params, entry)
+        return entry
+
+    def evict(self):
+        """Drop least recently used entries until the directory fits in max_bytes."""
+        entries = []
+        for path in self.entries():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            _remove(path)
+
+    def clear(self):
+        for path in self.entries():
+            _remove(path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
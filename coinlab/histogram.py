@@ -0,0 +1,128 @@
+import numpy as np
+
+
+class HeadCountHistogram:
+    """Head counts kept as a bincount over 0..n_tosses plus a cumulative table.
+
+    One O(n) pass builds it; after that thresholds, intervals, bin sets and
+    quantiles are lookups into the cumulative table.
+    """
+
+    def __init__(self, n_tosses=100):
+        self.n_tosses = n_tosses
+        self.counts = np.zeros(n_tosses + 1, dtype=np.int64)
+        self._cumulative = None
+
+    @classmethod
+    def from_counts(cls, heads, n_tosses=None):
+        """Histogram of heads over 0..n_tosses; without n_tosses it spans 0..max(heads)."""
+        heads = np.asarray(heads, dtype=np.int64)
+        if n_tosses is None:
+            n_tosses = int(heads.max()) if heads.size else 0
+        histogram = cls(n_tosses)
+        histogram.add(heads)
+        return histogram
+
+    def add(self, heads):
+        heads = np.asarray(heads, dtype=np.int64)
+        if heads.size and (heads.min() < 0 or heads.max() > self.n_tosses):
+            raise ValueError(f"head counts must lie in 0..{self.n_tosses}")
+        self.counts += np.bincount(heads, minlength=self.n_tosses + 1)
+        self._cumulative = None
+        return self
+
+    def merge(self, other):
+        self.counts += other.counts
+        self._cumulative = None
+        return self
+
+    @property
+    def total(self):
+        return int(self.cumulative[-1])
+
+    @property
+    def cumulative(self):
+        """cumulative[h] is the number of samples with fewer than h heads."""
+        if self._cumulative is None:
+            self._cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        return self._cumulative
+
+    def count_below(self, value):
+        return self.cumulative[int(np.clip(value, 0, self.n_tosses + 1))]
+
+    def count_between(self, lower, upper):
+        """Number of samples with lower <= heads < upper."""
+        return max(0, self.count_below(upper) - self.count_below(lower))
+
+    def prob_between(self, lower, upper):
+        return self.count_between(lower, upper) / self.total
+
+    def prob_greater(self, threshold):
+        return self.count_between(threshold + 1, self.n_tosses + 1) / self.total
+
+    def bin_probs(self, edges, closed_last=True):
+        """Probabilities of [edges[i], edges[i+1]), the last bin closed on the right if asked."""
+        edges = np.asarray(edges)
+        below = self.cumulative[np.clip(edges, 0, self.n_tosses + 1)]
+        if closed_last:
+            below[-1] = self.count_below(edges[-1] + 1)
+        return np.diff(below) / self.total
+
+    def sorted_value(self, index):
+        """Value that sorted(heads)[index] would return."""
+        return int(np.searchsorted(self.cumulative, index, side='right')) - 1
+
+    def quantile_interval(self, level=0.95):
+        """Central interval picked by sorted-sample indices, as in CoinExperiment.analyze_experiments."""
+        lower, upper = quantile_intervals(self.counts, level)
+        return int(lower[0]), int(upper[0])
+
+    def shortest_interval(self, level=0.95):
+        """Shortest [lower, upper] with coverage >= level, in O(n_tosses log n_tosses)."""
+        lower, upper = shortest_intervals(self.counts, level)
+        return int(lower[0]), int(upper[0])
+
+    def mean(self):
+        return np.dot(np.arange(self.n_tosses + 1), self.counts) / self.total
+
+
+def quantile_intervals(counts, level=0.95):
+    """HeadCountHistogram.quantile_interval for every row of a (n_rows, n_tosses + 1) table."""
+    cumulative = np.cumsum(np.atleast_2d(counts), axis=1)
+    n = cumulative[:, -1]
+    tail = round((1 - level) / 2, 10)
+    lower_index = (tail * n).astype(np.int64)
+    upper_index = np.minimum(n - 1, ((1 - tail) * n).astype(np.int64))
+    lower = np.sum(cumulative <= lower_index[:, None], axis=1)
+    upper = np.sum(cumulative <= upper_index[:, None], axis=1)
+    return lower, upper
+
+
+def shortest_intervals(weights, level=0.95):
+    """Shortest [lower, upper] (inclusive) holding at least `level` of each row's mass.
+
+    Works on the cumulative table of every row at once: a binary search over the
+    interval length, each step checking all window sums of that length.
+    """
+    weights = np.atleast_2d(weights)
+    n_rows, size = weights.shape
+    cumulative = np.zeros((n_rows, size + 1), dtype=np.result_type(weights, np.int64))
+    cumulative[:, 1:] = np.cumsum(weights, axis=1)
+    need = level * cumulative[:, -1] * (1 - 1e-12)
+    starts = np.arange(size)
+    rows = np.arange(n_rows)[:, None]
+
+    def coverage(span):
+        ends = starts + span[:, None] + 1
+        window = cumulative[rows, np.minimum(ends, size)] - cumulative[:, :size]
+        return np.where(ends <= size, window, -1)
+
+    lo = np.zeros(n_rows, dtype=np.int64)
+    hi = np.full(n_rows, size - 1, dtype=np.int64)
+    while np.any(lo < hi):
+        mid = (lo + hi) // 2
+        enough = coverage(mid).max(axis=1) >= need
+        hi = np.where(enough, mid, hi)
+        lo = np.where(enough, lo, mid + 1)
+    lower = coverage(lo).argmax(axis=1)
+    return lower, lower + lo
@@ -0,0 +1,40 @@
+import numpy as np
+
+from coinlab.histogram import HeadCountHistogram
+from coinlab.rng import FlipSource
+from coinlab.streaming import stream_long_experiments
+
+
+def horizon_sweep(horizons, n_experiments=1000, p=0.5, series_length=5, level=0.95, threshold_share=0.6,
+                  n_bins=10, chunk_tosses=1 << 16, generate=None, rng=None):
+    """Q1-Q5 for every n_tosses in horizons from a single generation at the largest one.
+
+    An experiment of length N contains every shorter one as its prefix, so the tosses
+    are streamed once along the toss axis by stream_long_experiments with the horizons
+    as checkpoints. Q2 uses the threshold round(threshold_share * n) and Q3 n_bins equal
+    bins of [0, n]. Tosses come from generate, or from a FlipSource seeded with rng.
+    """
+    horizons = sorted(set(int(n) for n in horizons))
+    if not horizons or horizons[0] < 1:
+        raise ValueError("horizons must be positive toss counts")
+    if generate is not None and rng is not None:
+        raise ValueError("pass either generate or rng, not both")
+    generate = generate or FlipSource(seed=rng)
+    _, snapshots = stream_long_experiments(n_experiments, horizons[-1], p, chunk_tosses, series_length,
+                                           generate, horizons)
+    rows = {key: [] for key in ('mean_heads', 'prob_gt_60', 'bin_probs', 'confidence_interval',
+                                'prob_series_5', 'mean_max_series')}
+    for n in horizons:
+        counts, stats = snapshots[n]
+        heads = HeadCountHistogram.from_counts(counts, n)
+        rows['mean_heads'].append(heads.mean())
+        rows['prob_gt_60'].append(heads.prob_greater(round(threshold_share * n)))
+        rows['bin_probs'].append(heads.bin_probs(np.round(np.linspace(0, n, n_bins + 1)).astype(np.int64)))
+        rows['confidence_interval'].append(heads.quantile_interval(level))
+        rows['prob_series_5'].append(np.mean(stats.has_run))
+        rows['mean_max_series'].append(np.mean(stats.max_run))
+
+    result = {key: np.array(values) for key, values in rows.items()}
+    result['n_tosses'] = np.array(horizons)
+    result['interval_width'] = np.diff(result['confidence_interval'], axis=1)[:, 0]
+    return result
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def tilted_p(lower, upper, n_tosses=100, p=0.5):
+    """Sampling p that puts the mean of the head count inside [lower, upper)."""
+    if p <= 0 or p >= 1:
+        return p
+    if lower > n_tosses * p:
+        target = lower
+    elif upper - 1 < n_tosses * p:
+        target = upper - 1
+    else:
+        return p
+    return float(np.clip(target / n_tosses, 0.5 / n_tosses, 1 - 0.5 / n_tosses))
+
+
+def log_likelihood_ratio(heads, n_tosses, p, q):
+    """log of P_p(sequence) / P_q(sequence) for a sequence with the given head count."""
+    heads = np.asarray(heads, dtype=float)
+    return heads * (np.log(p) - np.log(q)) + (n_tosses - heads) * (np.log1p(-p) - np.log1p(-q))
+
+
+def importance_interval_prob(lower, upper, p=0.5, n_tosses=100, n_samples=10000, tilt=None, rng=None):
+    """P(lower <= heads < upper) estimated from head counts drawn at the tilted p.
+
+    Only the head count enters the event and the likelihood ratio, so each
+    experiment is a single binomial draw at the tilted p.
+    """
+    rng = np.random.default_rng(rng)
+    tilt = tilted_p(lower, upper, n_tosses, p) if tilt is None else tilt
+    heads = rng.binomial(n_tosses, tilt, n_samples)
+    inside = (heads >= lower) & (heads < upper)
+    weights = inside * 1.0
+    if tilt != p:
+        weights[inside] = np.exp(log_likelihood_ratio(heads[inside], n_tosses, p, tilt))
+
+    estimate = weights.mean()
+    std_error = weights.std(ddof=1) / np.sqrt(n_samples) if n_samples > 1 else np.inf
+    ess = weights.sum() ** 2 / np.sum(weights ** 2) if weights.any() else 0.0
+    return {
+        'estimate': estimate,
+        'std_error': std_error,
+        'relative_error': std_error / estimate if estimate > 0 else np.inf,
+        'tilt': tilt,
+        'n_samples': n_samples,
+        'effective_sample_size': ess,
+    }
+
+
+def importance_tail_probs(p=0.5, n_tosses=100, n_samples=10000, threshold=60, bin_width=10, rng=None):
+    """prob_gt_60 and the Q3 bin probabilities, each bin sampled at its own tilt."""
+    rng = np.random.default_rng(rng)
+    bins = np.arange(0, n_tosses + 1, bin_width)
+    uppers = list(bins[1:-1]) + [n_tosses + 1]
+    bin_results = [importance_interval_prob(lower, upper, p, n_tosses, n_samples, rng=rng)
+                   for lower, upper in zip(bins[:-1], uppers)]
+    return {
+        'prob_gt_60': importance_interval_prob(threshold + 1, n_tosses + 1, p, n_tosses, n_samples, rng=rng),
+        'bin_probs': bin_results,
+    }
@@ -0,0 +1,53 @@
+import numpy as np
+
+from coinlab.runs import run_stats
+
+
+def arrange_heads(counts, n_tosses, rng=np.random):
+    """(rows, n_tosses) uint8 tosses with counts[i] heads placed uniformly at random in row i.
+
+    Given its head count, a Bernoulli sequence is a uniformly random arrangement, so
+    counts ~ Binomial(n, p) followed by this gives exactly the i.i.d. flip distribution.
+    """
+    counts = np.asarray(counts)
+    keys = rng.random((counts.size, n_tosses))
+    kth = np.take_along_axis(np.sort(keys, axis=1), np.maximum(counts, 1)[:, None] - 1, axis=1)
+    return ((keys <= kth) & (counts[:, None] > 0)).view(np.uint8)
+
+
+class LazyTosses:
+    """Head counts drawn as Binomial(n_tosses, p); sequences are materialized on first use.
+
+    rng is anything with binomial() and random(): np.random (the legacy global state)
+    or a np.random.Generator. Materialized sequences agree with the counts and are kept.
+    """
+
+    def __init__(self, n_experiments, n_tosses, p=0.5, rng=np.random):
+        self.n_experiments = n_experiments
+        self.n_tosses = n_tosses
+        self.p = p
+        self.rng = rng
+        self.counts = rng.binomial(n_tosses, p, n_experiments)
+        self._tosses = None
+
+    def __len__(self):
+        return self.n_experiments
+
+    def __getitem__(self, index):
+        return self.tosses[index]
+
+    @property
+    def materialized(self):
+        return self._tosses is not None
+
+    @property
+    def tosses(self):
+        if self._tosses is None:
+            self._tosses = arrange_heads(self.counts, self.n_tosses, self.rng)
+        return self._tosses
+
+    def head_counts(self):
+        return self.counts
+
+    def run_stats(self, series_length=5):
+        return run_stats(self.tosses, series_length)
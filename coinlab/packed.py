@@ -0,0 +1,186 @@
+import os
+import tempfile
+import weakref
+import numpy as np
+
+from coinlab.runs import RunStats
+from coinlab.streaming import StreamingAccumulator
+
+
+_BYTES = np.arange(256, dtype=np.uint8)
+_BITS = np.unpackbits(_BYTES[:, None], axis=1)
+
+POPCOUNT = _BITS.sum(axis=1).astype(np.uint8)
+
+
+def _leading_ones(bits):
+    return np.argmin(np.hstack([bits, np.zeros((256, 1), dtype=bits.dtype)]), axis=1)
+
+
+def _longest_inner_run(bits):
+    longest = np.zeros(256, dtype=np.uint8)
+    current = np.zeros(256, dtype=np.uint8)
+    for col in range(8):
+        current = np.where(bits[:, col] == 1, current + 1, 0)
+        longest = np.maximum(longest, current)
+    return longest
+
+
+LEADING_ONES = _leading_ones(_BITS).astype(np.uint8)
+TRAILING_ONES = _leading_ones(_BITS[:, ::-1]).astype(np.uint8)
+LONGEST_RUN = _longest_inner_run(_BITS)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class PackedTosses:
+    """Tosses stored 1 bit each in a memory-mapped .npy file, first toss in the high bit.
+
+    A file created without an explicit path is a temporary one and is removed on
+    close() or when the object is garbage-collected.
+    """
+
+    def __init__(self, path, n_tosses, mode="r", n_experiments=None, chunk_rows=1 << 16):
+        self.path = path
+        self.n_tosses = n_tosses
+        self.n_bytes = -(-n_tosses // 64) * 8
+        self.chunk_rows = chunk_rows
+        if mode == "w+":
+            self.bits = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8,
+                                                  shape=(n_experiments, self.n_bytes))
+        else:
+            self.bits = np.load(path, mmap_mode=mode)
+            if self.bits.shape[1] != self.n_bytes:
+                raise ValueError(f"{path} does not hold {n_tosses} tosses per experiment")
+        self.n_experiments = self.bits.shape[0]
+        self._cleanup = None
+
+    @classmethod
+    def create(cls, n_experiments, n_tosses, path=None, chunk_rows=1 << 16):
+        if path is not None:
+            return cls(path, n_tosses, mode="w+", n_experiments=n_experiments, chunk_rows=chunk_rows)
+        fd, path = tempfile.mkstemp(suffix=".npy", prefix="tosses_")
+        os.close(fd)
+        try:
+            packed = cls(path, n_tosses, mode="w+", n_experiments=n_experiments, chunk_rows=chunk_rows)
+        except BaseException:
+            _remove(path)
+            raise
+        packed._cleanup = weakref.finalize(packed, _remove, path)
+        return packed
+
+    def close(self):
+        """Release the memory map; a temporary file is deleted."""
+        self.bits = None
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.n_experiments
+
+    def __getitem__(self, index):
+        return self.unpack(index)
+
+    def write(self, start, tosses):
+        tosses = np.atleast_2d(np.asarray(tosses))
+        packed = np.packbits(tosses.astype(bool), axis=1)
+        rows = slice(start, start + tosses.shape[0])
+        self.bits[rows, :packed.shape[1]] = packed
+        self.bits[rows, packed.shape[1]:] = 0
+
+    def write_packed(self, start, packed):
+        self.bits[start:start + len(packed)] = packed
+
+    def flush(self):
+        if hasattr(self.bits, "flush"):
+            self.bits.flush()
+
+    def unpack(self, rows=slice(None)):
+        return np.unpackbits(self.bits[rows], axis=-1, count=self.n_tosses)
+
+    def head_counts(self):
+        counts = np.empty(self.n_experiments, dtype=np.min_scalar_type(self.n_tosses))
+        for start in range(0, self.n_experiments, self.chunk_rows):
+            chunk = np.asarray(self.bits[start:start + self.chunk_rows])
+            counts[start:start + len(chunk)] = POPCOUNT[chunk].sum(axis=1, dtype=np.int64)
+        return counts
+
+    def run_stats(self, series_length=5):
+        """Per-experiment RunStats; four int64 arrays, so prefer scan() for large files."""
+        max_run = np.empty(self.n_experiments, dtype=np.int64)
+        n_runs = np.empty(self.n_experiments, dtype=np.int64)
+        n_long_runs = np.empty(self.n_experiments, dtype=np.int64)
+        for start in range(0, self.n_experiments, self.chunk_rows):
+            chunk = np.asarray(self.bits[start:start + self.chunk_rows])
+            rows = slice(start, start + len(chunk))
+            words = chunk.view(">u8").astype(np.uint64)
+            run_starts = words & ~_shift_right(words, 1)
+            long_starts = _shift_and(words, series_length) & ~_shift_right(words, 1)
+            max_run[rows] = _max_run(chunk)
+            n_runs[rows] = popcount(run_starts)
+            n_long_runs[rows] = popcount(long_starts)
+        return RunStats(max_run, n_long_runs > 0, n_runs, n_long_runs)
+
+    def scan(self, series_length=5):
+        """Head counts plus a StreamingAccumulator of the head and longest-run histograms.
+
+        One pass over the file; besides the counts (one small integer per experiment)
+        only the per-chunk arrays and the histograms are held in memory.
+        """
+        counts = np.empty(self.n_experiments, dtype=np.min_scalar_type(self.n_tosses))
+        accumulator = StreamingAccumulator(self.n_tosses, series_length)
+        for start in range(0, self.n_experiments, self.chunk_rows):
+            chunk = np.asarray(self.bits[start:start + self.chunk_rows])
+            chunk_counts = popcount(chunk.view(">u8").astype(np.uint64))
+            counts[start:start + len(chunk)] = chunk_counts
+            accumulator.update_counts(chunk_counts, _max_run(chunk))
+        return counts, accumulator
+
+
+def popcount(words):
+    return POPCOUNT[words.view(np.uint8)].reshape(len(words), -1).sum(axis=1, dtype=np.int64)
+
+
+def _shift_left(words, step):
+    shifted = words << np.uint64(step)
+    shifted[:, :-1] |= words[:, 1:] >> np.uint64(64 - step)
+    return shifted
+
+
+def _shift_right(words, step):
+    shifted = words >> np.uint64(step)
+    shifted[:, 1:] |= words[:, :-1] << np.uint64(64 - step)
+    return shifted
+
+
+def _shift_and(words, series_length):
+    """A bit survives only where a run of series_length heads starts (doubling shift-AND)."""
+    words = words.copy()
+    covered = 1
+    while covered < series_length:
+        step = min(covered, series_length - covered, 63)
+        words &= _shift_left(words, step)
+        covered += step
+    return words
+
+
+def _max_run(chunk):
+    """Longest run per row from per-byte lookup tables, carrying the open run between bytes."""
+    longest = np.zeros(len(chunk), dtype=np.int64)
+    carry = np.zeros(len(chunk), dtype=np.int64)
+    for col in range(chunk.shape[1]):
+        byte = chunk[:, col]
+        longest = np.maximum(longest, np.maximum(carry + LEADING_ONES[byte], LONGEST_RUN[byte]))
+        carry = np.where(byte == 0xFF, carry + 8, TRAILING_ONES[byte])
+    return np.maximum(longest, carry)
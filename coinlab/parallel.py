@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from coinlab.profiling import phase
+from coinlab.sweep import TILE_BYTES, SweepAccumulator, sweep_p
+
+
+def sweep_tasks(n_p, n_experiments, shard_size=None):
+    """(p_index, rows) for every task; the split depends on the grid only, never on the worker count."""
+    shard_size = shard_size or n_experiments
+    return [(p_index, min(shard_size, n_experiments - start))
+            for p_index in range(n_p)
+            for start in range(0, n_experiments, shard_size)]
+
+
+def _run_task(args):
+    p_index, p, rows, n_tosses, series_length, seed, tile_bytes = args
+    result = sweep_p([p], rows, n_tosses, series_length, rng=np.random.default_rng(seed), tile_bytes=tile_bytes)
+    return p_index, result['head_count_hist'][0], result['max_run_hist'][0]
+
+
+def parallel_sweep(p_values, n_experiments=1000, n_tosses=100, series_length=5, level=0.95,
+                   seed=None, n_workers=None, shard_size=None, tile_bytes=TILE_BYTES, profiler=None):
+    """sweep_p spread over a process pool.
+
+    Every task draws from its own child of SeedSequence(seed), so the output is
+    bit-identical for any n_workers (n_workers=1 runs in-process).
+    """
+    accumulator = SweepAccumulator(p_values, n_tosses, series_length)
+    tasks = sweep_tasks(accumulator.p_values.size, n_experiments, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    args = [(p_index, accumulator.p_values[p_index], rows, n_tosses, series_length, task_seed, tile_bytes)
+            for (p_index, rows), task_seed in zip(tasks, seeds)]
+
+    with phase(profiler, 'parallel_sweep.shards', accumulator.p_values.size * n_experiments * n_tosses):
+        if n_workers == 1:
+            results = list(map(_run_task, args))
+        else:
+            n_workers = n_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                results = list(executor.map(_run_task, args, chunksize=max(1, len(args) // (4 * n_workers))))
+
+    with phase(profiler, 'parallel_sweep.result'):
+        for p_index, head_hist, max_run_hist in results:
+            accumulator.head_hist[p_index] += head_hist
+            accumulator.max_run_hist[p_index] += max_run_hist
+        return accumulator.result(level)
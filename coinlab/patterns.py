@@ -0,0 +1,121 @@
+from collections import deque
+
+import numpy as np
+
+
+SYMBOLS = {'H': 1, 'T': 0, 'О': 1, 'Р': 0, '1': 1, '0': 0}
+
+
+def encode(pattern):
+    """'HTHTH' (or 'ОРОРО', '10101', a 0/1 sequence) as a tuple of 0/1, 1 = heads."""
+    if isinstance(pattern, str):
+        return tuple(SYMBOLS[symbol] for symbol in pattern.upper())
+    return tuple(int(flip) for flip in pattern)
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton over {tails, heads} for a set of toss patterns.
+
+    State s is the longest pattern prefix that is a suffix of the tosses so far;
+    delta[s, flip] is the next state and output[s, i] says pattern i has just ended.
+    All patterns are tracked by the same walk, so every question is a single pass.
+    """
+
+    def __init__(self, patterns):
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        self.patterns = [encode(pattern) for pattern in patterns]
+        if not self.patterns or not all(self.patterns):
+            raise ValueError("need at least one non-empty pattern")
+
+        children = [{}]
+        ends = [set()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for flip in pattern:
+                if flip not in children[state]:
+                    children[state][flip] = len(children)
+                    children.append({})
+                    ends.append(set())
+                state = children[state][flip]
+            ends[state].add(index)
+
+        n_states = len(children)
+        self.delta = np.zeros((n_states, 2), dtype=np.int64)
+        fail = np.zeros(n_states, dtype=np.int64)
+        queue = deque()
+        for flip in (0, 1):
+            if flip in children[0]:
+                self.delta[0, flip] = children[0][flip]
+                queue.append(children[0][flip])
+        while queue:
+            state = queue.popleft()
+            ends[state] |= ends[fail[state]]
+            for flip in (0, 1):
+                if flip in children[state]:
+                    child = children[state][flip]
+                    fail[child] = self.delta[fail[state], flip]
+                    self.delta[state, flip] = child
+                    queue.append(child)
+                else:
+                    self.delta[state, flip] = self.delta[fail[state], flip]
+
+        self.output = np.zeros((n_states, len(self.patterns)), dtype=bool)
+        for state, indices in enumerate(ends):
+            self.output[state, list(indices)] = True
+
+    @property
+    def n_states(self):
+        return len(self.delta)
+
+    def first_hits(self, tosses):
+        """(rows, n_patterns) toss count at which each pattern first completes, -1 if it never does."""
+        tosses = np.atleast_2d(np.asarray(tosses) != 0).view(np.uint8)
+        state = np.zeros(tosses.shape[0], dtype=np.int64)
+        first = np.full((tosses.shape[0], len(self.patterns)), -1, dtype=np.int64)
+        for column in range(tosses.shape[1]):
+            state = self.delta[state, tosses[:, column]]
+            first[self.output[state] & (first < 0)] = column + 1
+        return first
+
+    def first_pattern(self, tosses):
+        """Index of the pattern that appears first in each row (-1 if none); ties go to the lower index."""
+        first = self.first_hits(tosses)
+        earliest = np.where(first < 0, np.iinfo(np.int64).max, first)
+        winner = np.argmin(earliest, axis=1)
+        return np.where(first.max(axis=1) < 0, -1, winner)
+
+    def transition_matrix(self, p=0.5):
+        matrix = np.zeros((self.n_states, self.n_states))
+        states = np.arange(self.n_states)
+        np.add.at(matrix, (states, self.delta[:, 1]), p)
+        np.add.at(matrix, (states, self.delta[:, 0]), 1 - p)
+        return matrix
+
+    def probabilities(self, n_tosses, p=0.5):
+        """Exact occurrence probabilities within n_tosses from the Markov chain on the states.
+
+        Row i of the propagated distribution keeps only paths that have not completed
+        pattern i yet; one more row keeps paths with no pattern at all, and the mass it
+        loses at each toss is credited to the pattern completed then (lowest index on
+        ties), which gives P(pattern i is the first to appear).
+        """
+        matrix = self.transition_matrix(p)
+        n_patterns = len(self.patterns)
+        alive = np.vstack([~self.output.T, ~self.output.any(axis=1)]).astype(float)
+        winner = np.argmax(self.output, axis=1)
+        ended = self.output.any(axis=1)
+
+        distribution = np.zeros((n_patterns + 1, self.n_states))
+        distribution[:, 0] = 1.0
+        first = np.zeros(n_patterns)
+        for _ in range(n_tosses):
+            distribution = distribution @ matrix
+            first += np.bincount(winner[ended], weights=distribution[-1, ended], minlength=n_patterns)
+            distribution *= alive
+        survival = distribution.sum(axis=1)
+        return {
+            'occurs': 1 - survival[:-1],
+            'any': 1 - survival[-1],
+            'first': first,
+        }
@@ -0,0 +1,140 @@
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, None where resource is unavailable (Windows)."""
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class Profiler:
+    """Wall time, flips/sec, traced allocations and peak RSS growth per named phase.
+
+    Phases may nest; every call is recorded and report() aggregates them by name.
+    Allocation tracking uses tracemalloc (NumPy reports its buffers to it) and slows
+    pure-Python code down, so it can be switched off with track_allocations=False;
+    stop() (or leaving the profiler as a context manager) ends the tracing it started.
+
+    The RSS figure of a phase is how much it raised the process peak (ru_maxrss can
+    only grow), so a phase that stays below an earlier peak reports 0. The report
+    also carries the process peak itself.
+    """
+
+    def __init__(self, track_allocations=True):
+        self.track_allocations = track_allocations
+        self.records = []
+        self._stack = []
+        self._started = time.perf_counter()
+        self._started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stop(self):
+        """Stop tracemalloc if this profiler started it; later phases record no allocations."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.track_allocations = False
+
+    @contextlib.contextmanager
+    def phase(self, name, flips=0):
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        frame = {'name': name, 'flips': flips, 'peak': 0, 'current': self._traced()[0]}
+        rss_start = peak_rss_bytes()
+        self._fold_peak()
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield frame
+        finally:
+            wall = time.perf_counter() - start
+            self._fold_peak()
+            self._stack.pop()
+            current = self._traced()[0]
+            rss_end = peak_rss_bytes()
+            self.records.append({
+                'name': name,
+                'wall_time': wall,
+                'flips': frame['flips'],
+                'alloc_peak': max(frame['peak'] - frame['current'], 0),
+                'alloc_net': current - frame['current'],
+                'peak_rss_growth': rss_end - rss_start if rss_end is not None else None,
+            })
+
+    def _traced(self):
+        return tracemalloc.get_traced_memory() if self.track_allocations else (0, 0)
+
+    def _fold_peak(self):
+        """Credit the peak since the last reset to every open phase, then reset it."""
+        if not self.track_allocations:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame['peak'] = max(frame['peak'], peak)
+        tracemalloc.reset_peak()
+
+    def report(self):
+        phases = {}
+        for record in self.records:
+            phase = phases.setdefault(record['name'], {'calls': 0, 'wall_time': 0.0, 'flips': 0,
+                                                       'alloc_peak': 0, 'alloc_net': 0, 'peak_rss_growth': None})
+            phase['calls'] += 1
+            phase['wall_time'] += record['wall_time']
+            phase['flips'] += record['flips']
+            phase['alloc_net'] += record['alloc_net']
+            phase['alloc_peak'] = max(phase['alloc_peak'], record['alloc_peak'])
+            if record['peak_rss_growth'] is not None:
+                phase['peak_rss_growth'] = max(phase['peak_rss_growth'] or 0, record['peak_rss_growth'])
+        for phase in phases.values():
+            phase['flips_per_sec'] = phase['flips'] / phase['wall_time'] if phase['flips'] and phase['wall_time'] else None
+        return {
+            'total_wall_time': time.perf_counter() - self._started,
+            'process_peak_rss': peak_rss_bytes(),
+            'phases': phases,
+        }
+
+    def to_json(self, path=None):
+        text = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, "w") as output:
+                output.write(text)
+        return text
+
+    def summary(self):
+        """One line: every phase's wall time (and flips/sec), then the total and the process peak RSS."""
+        report = self.report()
+        parts = []
+        for name, phase in report['phases'].items():
+            part = f"{name} {phase['wall_time']:.3f}s"
+            if phase['flips_per_sec']:
+                part += f" ({phase['flips_per_sec']:.3g} flips/s)"
+            parts.append(part)
+        total = f"total {report['total_wall_time']:.3f}s"
+        if report['process_peak_rss'] is not None:
+            total += f", process peak RSS {report['process_peak_rss'] / 2 ** 20:.0f} MiB"
+        parts.append(total)
+        return " | ".join(parts)
+
+
+def phase(profiler, name, flips=0):
+    """profiler.phase(name, flips), or a no-op context when profiling is off."""
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.phase(name, flips)
@@ -0,0 +1,74 @@
+import numpy as np
+
+from coinlab.sweep import SweepAccumulator, sweep_p_coupled
+
+
+def curve_errors(accumulator):
+    """Standard errors of mean_heads, prob_series_5 and mean_max_series for every p."""
+    n = accumulator.head_hist.sum(axis=1)
+    values = np.arange(accumulator.n_tosses + 1)
+
+    def mean_error(hist):
+        mean = hist @ values / n
+        return np.sqrt(np.maximum(hist @ values ** 2 / n - mean ** 2, 0) / n)
+
+    prob = accumulator.max_run_hist[:, accumulator.series_length:].sum(axis=1) / n
+    return {
+        'mean_heads': mean_error(accumulator.head_hist),
+        'prob_series_5': np.sqrt(prob * (1 - prob) / n),
+        'mean_max_series': mean_error(accumulator.max_run_hist),
+    }
+
+
+def interval_scores(result, errors, curves, z):
+    """For each pair of neighbouring p, the largest |difference| in units of z joint standard errors."""
+    scores = np.zeros(len(result['p_values']) - 1)
+    for curve in curves:
+        difference = np.abs(np.diff(result[curve]))
+        error = z * np.hypot(errors[curve][:-1], errors[curve][1:])
+        score = np.divide(difference, error, out=np.where(difference > 0, np.inf, 0.0), where=error > 0)
+        scores = np.maximum(scores, score)
+    return scores
+
+
+def refine_sweep(budget, n_experiments=1000, initial_points=11, n_tosses=100, series_length=5, level=0.95,
+                 curves=('prob_series_5',), z=2.0, min_step=1 / 1024, rng=None):
+    """Item-6 curves on a p grid refined where neighbouring estimates are not resolved.
+
+    Starts from a uniform grid of initial_points on [0, 1]. Each round bisects the
+    intervals whose neighbouring estimates (for any of the given curves) differ by more
+    than z joint standard errors, worst first. It stops when all neighbours agree, the
+    step reaches min_step, or the budget (total experiments) is spent. Each new point
+    gets n_experiments of its own. The initial grid alone must fit in the budget.
+    """
+    if initial_points * n_experiments > budget:
+        raise ValueError(f"budget {budget} is smaller than the initial grid of "
+                         f"{initial_points} x {n_experiments} experiments")
+    rng = np.random.default_rng(rng)
+    p_values = np.linspace(0, 1, initial_points)
+    initial = sweep_p_coupled(p_values, n_experiments, n_tosses, series_length, level, rng)
+    head_hist, max_run_hist = initial['head_count_hist'], initial['max_run_hist']
+    n_simulated = p_values.size * n_experiments
+
+    while True:
+        accumulator = SweepAccumulator(p_values, n_tosses, series_length)
+        accumulator.head_hist, accumulator.max_run_hist = head_hist, max_run_hist
+        result = accumulator.result(level)
+        scores = interval_scores(result, curve_errors(accumulator), curves, z)
+        wide = np.diff(p_values) / 2 >= min_step
+        candidates = np.flatnonzero((scores > 1) & wide)
+        n_new = min(candidates.size, (budget - n_simulated) // n_experiments)
+        if n_new <= 0:
+            break
+        chosen = candidates[np.argsort(-scores[candidates], kind='stable')[:n_new]]
+        midpoints = (p_values[chosen] + p_values[chosen + 1]) / 2
+        new = sweep_p_coupled(midpoints, n_experiments, n_tosses, series_length, level, rng)
+        n_simulated += midpoints.size * n_experiments
+
+        order = np.argsort(np.concatenate([p_values, midpoints]), kind='stable')
+        p_values = np.concatenate([p_values, midpoints])[order]
+        head_hist = np.concatenate([head_hist, new['head_count_hist']])[order]
+        max_run_hist = np.concatenate([max_run_hist, new['max_run_hist']])[order]
+
+    result['n_simulated'] = n_simulated
+    return result
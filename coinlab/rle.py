@@ -0,0 +1,98 @@
+import numpy as np
+
+from coinlab.runs import RunStats
+
+
+class RunLengthTosses:
+    """Experiments stored as alternating run lengths instead of individual tosses.
+
+    Row i owns lengths[offsets[i]:offsets[i + 1]]; its first run has value first[i]
+    and the values alternate after that. Head counts and run statistics cost
+    O(number of runs), which for p near 0 or 1 is far below n_tosses.
+    """
+
+    def __init__(self, lengths, offsets, first, n_tosses):
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.first = np.asarray(first, dtype=np.uint8)
+        self.n_tosses = n_tosses
+        self.n_experiments = len(self.offsets) - 1
+        self.rows = np.repeat(np.arange(self.n_experiments), np.diff(self.offsets))
+        self.values = (self.first[self.rows] + np.arange(len(self.lengths)) - self.offsets[self.rows]) % 2
+
+    @classmethod
+    def generate(cls, n_experiments, n_tosses, p=0.5, rng=np.random):
+        """Draw every experiment as alternating geometric run lengths.
+
+        A run of heads ends after each toss with probability 1 - p, a run of tails
+        with probability p; the last run is cut at n_tosses. rng is np.random or a
+        np.random.Generator.
+        """
+        first = (rng.random(n_experiments) < p).astype(np.uint8)
+        if p <= 0 or p >= 1:
+            return cls(np.full(n_experiments, n_tosses), np.arange(n_experiments + 1), first, n_tosses)
+
+        position = np.zeros(n_experiments, dtype=np.int64)
+        value = first.copy()
+        active = np.arange(n_experiments)
+        rows, lengths = [], []
+        while active.size:
+            length = rng.geometric(np.where(value[active] == 1, 1 - p, p))
+            length = np.minimum(length, n_tosses - position[active])
+            rows.append(active)
+            lengths.append(length)
+            position[active] += length
+            value[active] ^= 1
+            active = active[position[active] < n_tosses]
+
+        rows = np.concatenate(rows)
+        order = np.argsort(rows, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_experiments))])
+        return cls(np.concatenate(lengths)[order], offsets, first, n_tosses)
+
+    @classmethod
+    def from_tosses(cls, tosses):
+        tosses = np.atleast_2d(np.asarray(tosses)) != 0
+        n_rows, n_tosses = tosses.shape
+        changes = np.ones((n_rows, n_tosses + 1), dtype=bool)
+        changes[:, 1:-1] = tosses[:, 1:] != tosses[:, :-1]
+        rows, positions = np.nonzero(changes)
+        lengths = np.diff(positions)[np.diff(rows) == 0]
+        offsets = np.concatenate([[0], np.cumsum(changes.sum(axis=1) - 1)])
+        return cls(lengths, offsets, tosses[:, 0], n_tosses)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['lengths'], data['offsets'], data['first'], int(data['n_tosses']))
+
+    def save(self, path):
+        np.savez_compressed(path, lengths=self.lengths, offsets=self.offsets, first=self.first,
+                            n_tosses=self.n_tosses)
+
+    def __len__(self):
+        return self.n_experiments
+
+    def __getitem__(self, index):
+        return self.unpack(index)
+
+    def unpack(self, rows=slice(None)):
+        """Decode rows back to a uint8 toss matrix (a single row for an integer index)."""
+        selected = np.arange(self.n_experiments)[rows]
+        runs = np.concatenate([np.arange(self.offsets[row], self.offsets[row + 1]) for row in np.atleast_1d(selected)])
+        tosses = np.repeat(self.values[runs], self.lengths[runs]).astype(np.uint8)
+        return tosses.reshape(-1, self.n_tosses) if np.ndim(selected) else tosses
+
+    def head_counts(self):
+        return np.add.reduceat(self.lengths * self.values, self.offsets[:-1])
+
+    def run_stats(self, series_length=5):
+        return self.scan(series_length)[1]
+
+    def scan(self, series_length=5):
+        """Head counts and run statistics, one pass over the run lengths."""
+        heads = self.lengths * self.values
+        max_run = np.maximum.reduceat(heads, self.offsets[:-1])
+        n_runs = np.add.reduceat(self.values, self.offsets[:-1]).astype(np.int64)
+        n_long_runs = np.add.reduceat((heads >= series_length).astype(np.int64), self.offsets[:-1])
+        return np.add.reduceat(heads, self.offsets[:-1]), RunStats(max_run, max_run >= series_length, n_runs, n_long_runs)
@@ -0,0 +1,135 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+BACKENDS = ('numpy', 'threshold', 'bitsliced', 'auto')
+
+
+class FlipSource:
+    """Bulk Bernoulli flips (1 = heads) from a NumPy bit generator.
+
+    Backends:
+      numpy     -- Generator.random() < p;
+      threshold -- uint32 draws compared with round(p * 2**32), half the random bytes;
+      bitsliced -- p = 0.5 only, every random uint64 gives 64 flips;
+      auto      -- bitsliced for p = 0.5, threshold otherwise.
+    """
+
+    def __init__(self, backend='auto', seed=None, bit_generator='PCG64'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+        self.backend = backend
+        self.seed = seed
+        self.bit_generator = bit_generator
+        if isinstance(seed, np.random.Generator):
+            self.rng = seed
+        else:
+            self.rng = np.random.Generator(getattr(np.random, bit_generator)(seed))
+
+    def __call__(self, rows, n_tosses, p=0.5):
+        return self.flips(rows, n_tosses, p)
+
+    def _backend_for(self, p):
+        if self.backend == 'auto':
+            return 'bitsliced' if p == 0.5 else 'threshold'
+        if self.backend == 'bitsliced' and p != 0.5:
+            raise ValueError("bitsliced backend only generates a fair coin (p=0.5)")
+        return self.backend
+
+    def flips(self, rows, n_tosses, p=0.5):
+        """(rows, n_tosses) uint8 matrix of flips."""
+        backend = self._backend_for(p)
+        if backend == 'bitsliced':
+            return np.unpackbits(self.packed_flips(rows, n_tosses), axis=1, count=n_tosses)
+        if backend == 'threshold':
+            threshold = int(round(p * (1 << 32)))
+            uniforms = self.rng.integers(0, 1 << 32, (rows, n_tosses), dtype=np.uint32)
+            return (uniforms < threshold).view(np.uint8)
+        return (self.rng.random((rows, n_tosses)) < p).view(np.uint8)
+
+    def packed_flips(self, rows, n_tosses, p=0.5):
+        """Flips packed 1 bit each in the PackedTosses row layout (rows padded to 64-bit words)."""
+        n_words = -(-n_tosses // 64)
+        if self._backend_for(p) != 'bitsliced':
+            packed = np.zeros((rows, n_words * 8), dtype=np.uint8)
+            packed[:, :-(-n_tosses // 8)] = np.packbits(self.flips(rows, n_tosses, p), axis=1)
+            return packed
+        words = self.rng.integers(0, np.iinfo(np.uint64).max, (rows, n_words), dtype=np.uint64, endpoint=True)
+        packed = words.view(np.uint8).reshape(rows, n_words * 8)
+        packed &= np.packbits(np.arange(n_words * 64) < n_tosses)
+        return packed
+
+    def flip_lists(self, rows, n_tosses, p=0.5, chunk_rows=1 << 12):
+        """Yield rows experiments as plain Python lists, for the pure-Python lab scripts.
+
+        Flips are drawn in bulk chunk_rows experiments at a time, so the per-call NumPy
+        overhead is paid per chunk rather than per experiment.
+        """
+        for start in range(0, rows, chunk_rows):
+            yield from self.flips(min(chunk_rows, rows - start), n_tosses, p).tolist()
+
+
+class ThreadedFlipSource(FlipSource):
+    """FlipSource that fills one preallocated matrix from a thread pool.
+
+    The rows are split into fixed blocks of block_rows. Every block draws from its own
+    child of a SeedSequence keyed by one draw from self.rng, and is written in place in
+    slices of scratch_rows. NumPy releases the GIL while it fills and compares arrays,
+    so the threads run concurrently. The result depends on the seed and block_rows
+    only, not on n_threads.
+    """
+
+    def __init__(self, backend='auto', seed=None, bit_generator='PCG64', n_threads=None,
+                 block_rows=1 << 13, scratch_rows=1 << 10):
+        super().__init__(backend, seed, bit_generator)
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self.block_rows = block_rows
+        self.scratch_rows = scratch_rows
+
+    def flips(self, rows, n_tosses, p=0.5):
+        return self.fill(np.empty((rows, n_tosses), dtype=np.uint8), p)
+
+    def packed_flips(self, rows, n_tosses, p=0.5):
+        n_words = -(-n_tosses // 64)
+        packed = np.zeros((rows, n_words * 8), dtype=np.uint8)
+        packed[:, :-(-n_tosses // 8)] = np.packbits(self.flips(rows, n_tosses, p), axis=1)
+        return packed
+
+    def fill(self, out, p=0.5):
+        """Overwrite the (rows, n_tosses) uint8 matrix out with flips and return it."""
+        self._backend_for(p)
+        starts = range(0, len(out), self.block_rows)
+        key = int(self.rng.integers(0, 1 << 63))
+        seeds = np.random.SeedSequence(key).spawn(len(starts))
+        blocks = [(out[start:start + self.block_rows], seed) for start, seed in zip(starts, seeds)]
+        if self.n_threads == 1 or len(blocks) == 1:
+            for block, seed in blocks:
+                self._fill_block(block, seed, p)
+        else:
+            with ThreadPoolExecutor(max_workers=self.n_threads) as executor:
+                list(executor.map(lambda args: self._fill_block(*args, p), blocks))
+        return out
+
+    def _fill_block(self, block, seed, p):
+        """Fill block slice by slice: uniforms go to one scratch buffer, comparisons straight into block.
+
+        NumPy has no out= for integer draws, so the threshold backend still allocates its
+        uint32 slice, and the bitsliced one its packed words.
+        """
+        source = FlipSource(self.backend, np.random.Generator(getattr(np.random, self.bit_generator)(seed)))
+        backend = source._backend_for(p)
+        if backend == 'numpy':
+            scratch = np.empty((min(self.scratch_rows, len(block)), block.shape[1]))
+        threshold = int(round(p * (1 << 32)))
+        for start in range(0, len(block), self.scratch_rows):
+            view = block[start:start + self.scratch_rows]
+            if backend == 'numpy':
+                uniforms = source.rng.random(out=scratch[:len(view)])
+                np.less(uniforms, p, out=view.view(bool))
+            elif backend == 'threshold':
+                uniforms = source.rng.integers(0, 1 << 32, view.shape, dtype=np.uint32)
+                np.less(uniforms, threshold, out=view.view(bool))
+            else:
+                view[...] = np.unpackbits(source.packed_flips(len(view), block.shape[1]), axis=1, count=block.shape[1])
@@ -0,0 +1,81 @@
+import numpy as np
+from collections import namedtuple
+
+
+RunStats = namedtuple("RunStats", ["max_run", "has_run", "n_runs", "n_long_runs"])
+
+
+def run_boundaries(tosses):
+    """Row index, start and length of every run of heads in a (n_experiments, n_tosses) matrix."""
+    tosses = np.atleast_2d(np.asarray(tosses))
+    n_rows, n_cols = tosses.shape
+    padded = np.zeros((n_rows, n_cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = tosses != 0
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends - starts
+
+
+def run_stats(tosses, series_length=5):
+    """Per-row longest run, "has run >= series_length" and run counts in a few NumPy passes."""
+    tosses = np.atleast_2d(np.asarray(tosses))
+    n_rows = tosses.shape[0]
+    rows, _, lengths = run_boundaries(tosses)
+
+    max_run = np.zeros(n_rows, dtype=np.int64)
+    np.maximum.at(max_run, rows, lengths)
+    n_runs = np.bincount(rows, minlength=n_rows)
+    n_long_runs = np.bincount(rows[lengths >= series_length], minlength=n_rows)
+
+    return RunStats(max_run, max_run >= series_length, n_runs, n_long_runs)
+
+
+class RunScanner:
+    """run_stats for experiments fed in chunks along the toss axis.
+
+    Per experiment it carries the head count, the length of the run still open at
+    the end of the last chunk, and the statistics of the runs already closed. So a
+    single experiment of any length streams through in memory bounded by one chunk.
+    """
+
+    def __init__(self, n_experiments, series_length=5):
+        self.series_length = series_length
+        self.n_tosses = 0
+        self.heads = np.zeros(n_experiments, dtype=np.int64)
+        self.carry = np.zeros(n_experiments, dtype=np.int64)
+        self.max_run = np.zeros(n_experiments, dtype=np.int64)
+        self.n_runs = np.zeros(n_experiments, dtype=np.int64)
+        self.n_long_runs = np.zeros(n_experiments, dtype=np.int64)
+
+    def update(self, chunk):
+        """Fold the next (n_experiments, k) block of tosses into the carried state."""
+        chunk = np.atleast_2d(np.asarray(chunk))
+        n_rows, width = chunk.shape
+        self.heads += np.count_nonzero(chunk, axis=1)
+        self._close(np.flatnonzero((self.carry > 0) & (chunk[:, 0] == 0)))
+
+        rows, starts, lengths = run_boundaries(chunk)
+        continued = (starts == 0) & (self.carry[rows] > 0)
+        open_ = starts + lengths == width
+        lengths = lengths + np.where(continued, self.carry[rows], 0)
+        np.maximum.at(self.max_run, rows, lengths)
+
+        self.carry[:] = 0
+        self.carry[rows[open_]] = lengths[open_]
+        closed = ~open_
+        self.n_runs += np.bincount(rows[closed], minlength=n_rows)
+        self.n_long_runs += np.bincount(rows[closed & (lengths >= self.series_length)], minlength=n_rows)
+        self.n_tosses += width
+
+    def _close(self, rows):
+        self.n_runs[rows] += 1
+        self.n_long_runs[rows] += self.carry[rows] >= self.series_length
+        self.carry[rows] = 0
+
+    def result(self):
+        """RunStats over everything fed so far, counting the open runs as finished."""
+        open_ = self.carry > 0
+        n_runs = self.n_runs + open_
+        n_long_runs = self.n_long_runs + (self.carry >= self.series_length)
+        return RunStats(self.max_run.copy(), self.max_run >= self.series_length, n_runs, n_long_runs)
@@ -0,0 +1,86 @@
+import numpy as np
+
+from coinlab.histogram import HeadCountHistogram
+from coinlab.rng import FlipSource
+from coinlab.runs import RunScanner, run_stats
+
+
+class StreamingAccumulator:
+    """Constant-memory sufficient statistics for the lab-1 questions, folded in chunk by chunk."""
+
+    def __init__(self, n_tosses=100, series_length=5):
+        self.n_tosses = n_tosses
+        self.series_length = series_length
+        self.heads = HeadCountHistogram(n_tosses)
+        self.series_count = 0
+        self.max_run_hist = np.zeros(n_tosses + 1, dtype=np.int64)
+
+    def update(self, tosses):
+        counts = np.sum(tosses, axis=1)
+        stats = run_stats(tosses, self.series_length)
+        self.update_counts(counts, stats.max_run)
+
+    def update_counts(self, counts, max_run):
+        self.heads.add(counts)
+        self.series_count += int(np.count_nonzero(max_run >= self.series_length))
+        self.max_run_hist += np.bincount(max_run, minlength=self.n_tosses + 1)
+
+    def merge(self, other):
+        self.heads.merge(other.heads)
+        self.series_count += other.series_count
+        self.max_run_hist += other.max_run_hist
+        return self
+
+    @property
+    def n_experiments(self):
+        return self.heads.total
+
+    def result(self, threshold=60, bin_width=10):
+        n = self.n_experiments
+        lower, upper = self.heads.quantile_interval(0.95)
+
+        return {
+            'mean_heads': self.heads.mean(),
+            'prob_gt_60': self.heads.prob_greater(threshold),
+            'bin_probs': list(self.heads.bin_probs(np.arange(0, self.n_tosses + 1, bin_width))),
+            'confidence_interval': (lower, upper),
+            'interval_width': upper - lower,
+            'prob_series_5': self.series_count / n,
+            'mean_max_series': np.dot(np.arange(self.n_tosses + 1), self.max_run_hist) / n,
+            'results': None,
+            'all_tosses': None,
+            'head_count_hist': self.heads.counts,
+            'max_run_hist': self.max_run_hist,
+        }
+
+
+def stream_experiments(n_experiments, n_tosses=100, p=0.5, chunk_rows=1 << 14,
+                       series_length=5, generate=None):
+    """Simulate n_experiments in fixed-size chunks; peak memory depends on chunk_rows only."""
+    generate = generate or FlipSource()
+    accumulator = StreamingAccumulator(n_tosses, series_length)
+    for start in range(0, n_experiments, chunk_rows):
+        rows = min(chunk_rows, n_experiments - start)
+        accumulator.update(generate(rows, n_tosses, p))
+    return accumulator
+
+
+def stream_long_experiments(n_experiments, n_tosses, p=0.5, chunk_tosses=1 << 16, series_length=5,
+                            generate=None, checkpoints=()):
+    """Simulate experiments of any length in chunks along the toss axis.
+
+    Memory is bounded by n_experiments * chunk_tosses. Returns the RunScanner, plus
+    {n: (head counts, RunStats)} for every toss count in checkpoints (prefixes of the
+    same experiments).
+    """
+    generate = generate or FlipSource()
+    scanner = RunScanner(n_experiments, series_length)
+    checkpoints = sorted(set(checkpoints))
+    snapshots = {}
+    while scanner.n_tosses < n_tosses:
+        pending = [n for n in checkpoints if n > scanner.n_tosses]
+        stop = min([n_tosses, scanner.n_tosses + chunk_tosses] + pending)
+        scanner.update(generate(n_experiments, stop - scanner.n_tosses, p))
+        if scanner.n_tosses in checkpoints:
+            snapshots[scanner.n_tosses] = (scanner.heads.copy(), scanner.result())
+    return scanner, snapshots
@@ -0,0 +1,142 @@
+import numpy as np
+
+from coinlab.histogram import quantile_intervals, shortest_intervals
+from coinlab.profiling import phase
+from coinlab.runs import run_stats
+
+
+TILE_BYTES = 1 << 26
+
+
+class SweepAccumulator:
+    """Per-p histograms of head counts and longest runs, filled tile by tile."""
+
+    def __init__(self, p_values, n_tosses=100, series_length=5):
+        self.p_values = np.asarray(p_values, dtype=float)
+        self.n_tosses = n_tosses
+        self.series_length = series_length
+        self.head_hist = np.zeros((self.p_values.size, n_tosses + 1), dtype=np.int64)
+        self.max_run_hist = np.zeros((self.p_values.size, n_tosses + 1), dtype=np.int64)
+
+    def update(self, p_index, tosses):
+        counts = np.count_nonzero(tosses, axis=1)
+        max_run = run_stats(tosses, self.series_length).max_run
+        self.update_counts(p_index, counts, max_run)
+
+    def update_counts(self, p_index, counts, max_run):
+        size = self.head_hist.size
+        width = self.n_tosses + 1
+        p_index = np.asarray(p_index, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        max_run = np.asarray(max_run, dtype=np.int64)
+        self.head_hist += np.bincount(p_index * width + counts, minlength=size).reshape(self.head_hist.shape)
+        self.max_run_hist += np.bincount(p_index * width + max_run, minlength=size).reshape(self.max_run_hist.shape)
+
+    def merge(self, other):
+        self.head_hist += other.head_hist
+        self.max_run_hist += other.max_run_hist
+        return self
+
+    def result(self, level=0.95):
+        n = self.head_hist.sum(axis=1)
+        heads = np.arange(self.n_tosses + 1)
+        lower, upper = quantile_intervals(self.head_hist, level)
+        shortest_lower, shortest_upper = shortest_intervals(self.head_hist, level)
+        return {
+            'p_values': self.p_values,
+            'mean_heads': self.head_hist @ heads / n,
+            'interval_width': upper - lower,
+            'shortest_interval_width': shortest_upper - shortest_lower,
+            'prob_series_5': self.max_run_hist[:, self.series_length:].sum(axis=1) / n,
+            'mean_max_series': self.max_run_hist @ heads / n,
+            'n_experiments': n,
+            'head_count_hist': self.head_hist,
+            'max_run_hist': self.max_run_hist,
+        }
+
+
+def tile_rows(n_tosses, tile_bytes=TILE_BYTES):
+    """Rows of the flattened (p, experiment) axis that fit one tile of uniforms plus flips."""
+    return max(1, tile_bytes // (9 * n_tosses))
+
+
+def sweep_p(p_values, n_experiments=1000, n_tosses=100, series_length=5, level=0.95,
+            rng=None, tile_bytes=TILE_BYTES, profiler=None):
+    """The four item-6 curves for every p in one call.
+
+    The (p, experiment, toss) tensor is generated as memory-bounded tiles of the
+    flattened (p, experiment) axis, so a tile may span several p values. An optional
+    coinlab.profiling.Profiler times the generate/accumulate/result phases.
+    """
+    rng = np.random.default_rng(rng)
+    accumulator = SweepAccumulator(p_values, n_tosses, series_length)
+    total_rows = accumulator.p_values.size * n_experiments
+    rows_per_tile = tile_rows(n_tosses, tile_bytes)
+    for start in range(0, total_rows, rows_per_tile):
+        p_index = np.arange(start, min(start + rows_per_tile, total_rows)) // n_experiments
+        with phase(profiler, 'sweep_p.generate', p_index.size * n_tosses):
+            tosses = rng.random((p_index.size, n_tosses)) < accumulator.p_values[p_index, None]
+        with phase(profiler, 'sweep_p.accumulate'):
+            accumulator.update(p_index, tosses)
+    with phase(profiler, 'sweep_p.result'):
+        return accumulator.result(level)
+
+
+UNIFORM_SCALE = 1 << 32
+
+
+def p_thresholds(p_values):
+    """p as thresholds on uint32 uniforms: a toss is heads when U < threshold."""
+    return np.round(np.asarray(p_values, dtype=float) * UNIFORM_SCALE).astype(np.int64)
+
+
+def run_thresholds(uniforms):
+    """Column L-1 is the smallest window maximum over windows of length L.
+
+    A run of L heads exists exactly when the threshold exceeds it, so the longest
+    run at any p is the number of columns below that p's threshold.
+    """
+    n_tosses = uniforms.shape[1]
+    thresholds = np.empty(uniforms.shape, dtype=uniforms.dtype)
+    window = uniforms
+    thresholds[:, 0] = uniforms.min(axis=1)
+    for length in range(2, n_tosses + 1):
+        window = np.maximum(window[:, :-1], uniforms[:, length - 1:])
+        thresholds[:, length - 1] = window.min(axis=1)
+    return thresholds
+
+
+def count_below(sorted_rows, thresholds):
+    """#(row < threshold) for every row and every threshold with one searchsorted."""
+    n_rows, width = sorted_rows.shape
+    offsets = np.arange(n_rows, dtype=np.int64)[:, None] << 33
+    keys = (sorted_rows.astype(np.int64) + offsets).ravel()
+    positions = np.searchsorted(keys, (thresholds[None, :] + offsets).ravel(), side='left')
+    return positions.reshape(n_rows, -1) - width * np.arange(n_rows)[:, None]
+
+
+def sweep_p_coupled(p_values, n_experiments=1000, n_tosses=100, series_length=5, level=0.95,
+                    rng=None, tile_bytes=TILE_BYTES, profiler=None):
+    """sweep_p with common random numbers: one uniform matrix U serves every p as U < p.
+
+    Per experiment the head count and the longest run are monotone in p, so the
+    curves are monotone and the RNG cost is paid once for the whole grid.
+    """
+    rng = np.random.default_rng(rng)
+    accumulator = SweepAccumulator(p_values, n_tosses, series_length)
+    thresholds = p_thresholds(accumulator.p_values)
+    n_p = thresholds.size
+    rows_per_tile = max(1, tile_bytes // (16 * n_tosses + 40 * n_p))
+    for start in range(0, n_experiments, rows_per_tile):
+        rows = min(rows_per_tile, n_experiments - start)
+        with phase(profiler, 'sweep_p_coupled.generate', rows * n_tosses):
+            uniforms = rng.integers(0, UNIFORM_SCALE, (rows, n_tosses), dtype=np.uint32)
+        with phase(profiler, 'sweep_p_coupled.counts'):
+            counts = count_below(np.sort(uniforms, axis=1), thresholds)
+        with phase(profiler, 'sweep_p_coupled.runs'):
+            max_run = count_below(run_thresholds(uniforms), thresholds)
+        with phase(profiler, 'sweep_p_coupled.accumulate'):
+            p_index = np.broadcast_to(np.arange(n_p), counts.shape)
+            accumulator.update_counts(p_index.ravel(), counts.ravel(), max_run.ravel())
+    with phase(profiler, 'sweep_p_coupled.result'):
+        return accumulator.result(level)
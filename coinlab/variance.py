@@ -0,0 +1,88 @@
+import numpy as np
+
+from coinlab.analytic import head_count_pmf
+from coinlab.histogram import shortest_intervals
+from coinlab.lazy import arrange_heads
+from coinlab.runs import run_stats
+
+
+MODES = ('iid', 'antithetic', 'stratified')
+
+
+def question_values(tosses, threshold=60, bin_width=10, series_length=5):
+    """Per-experiment values whose means answer Q1, Q2, Q3 (one column per bin) and Q5."""
+    heads = np.sum(tosses, axis=1)
+    n_tosses = tosses.shape[1]
+    bins = np.minimum(heads // bin_width, n_tosses // bin_width - 1)
+    one_hot = bins[:, None] == np.arange(n_tosses // bin_width)
+    return np.column_stack([heads, heads > threshold, one_hot, run_stats(tosses, series_length).has_run]).astype(float)
+
+
+def _answers(estimate, error, variance, n_samples, weights, level):
+    """Split the column vectors into named questions with their effective sample sizes."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ess = np.where(error > 0, variance / error ** 2, np.where(variance > 0, np.inf, n_samples))
+    lower, upper = shortest_intervals(weights, level)
+
+    def answer(columns):
+        return {'estimate': estimate[columns], 'std_error': error[columns],
+                'ess': ess[columns], 'gain': ess[columns] / n_samples}
+
+    return {
+        'mean_heads': answer(0),
+        'prob_gt_60': answer(1),
+        'bin_probs': answer(slice(2, -1)),
+        'interval': (int(lower[0]), int(upper[0])),
+        'prob_series_5': answer(-1),
+        'n_samples': n_samples,
+    }
+
+
+def sample_questions(mode='iid', n_samples=10000, n_tosses=100, p=0.5, level=0.95, rng=None, min_mass=1e-12):
+    """Q1-Q5 by plain, antithetic or head-count-stratified sampling, with effective sample sizes.
+
+    antithetic -- pairs of sequences from uniforms U and 1 - U (for p = 0.5 every toss is
+                  flipped); the estimate averages pair means.
+    stratified -- n_samples spread over the head counts h in proportion to P(h) (at least
+                  two per stratum), each stratum sampled as a uniform arrangement of h
+                  heads; strata with P(h) < min_mass are left out.
+
+    For every mean the report has the standard error, the effective sample size
+    ess = (i.i.d. variance) / (estimator variance) and gain = ess / n_samples.
+    Q1-Q3 only depend on the head count, so under stratification they are exact.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    rng = np.random.default_rng(rng)
+
+    if mode == 'iid':
+        values = question_values((rng.random((n_samples, n_tosses)) < p).view(np.uint8))
+        variance = values.var(axis=0, ddof=1)
+        weights = np.bincount(values[:, 0].astype(np.int64), minlength=n_tosses + 1)
+        return _answers(values.mean(axis=0), np.sqrt(variance / n_samples), variance, n_samples, weights, level)
+
+    if mode == 'antithetic':
+        n_pairs = n_samples // 2
+        uniforms = rng.random((n_pairs, n_tosses))
+        first = question_values((uniforms < p).view(np.uint8))
+        second = question_values((1 - uniforms < p).view(np.uint8))
+        pairs = (first + second) / 2
+        values = np.vstack([first, second])
+        weights = np.bincount(values[:, 0].astype(np.int64), minlength=n_tosses + 1)
+        return _answers(pairs.mean(axis=0), np.sqrt(pairs.var(axis=0, ddof=1) / n_pairs),
+                        values.var(axis=0, ddof=1), 2 * n_pairs, weights, level)
+
+    pmf = head_count_pmf(n_tosses, p)
+    strata = np.flatnonzero(pmf >= min_mass)
+    allocation = np.maximum(2, np.round(n_samples * pmf[strata]).astype(np.int64))
+    counts = np.repeat(strata, allocation)
+    values = question_values(arrange_heads(counts, n_tosses, rng))
+    index = np.repeat(np.arange(strata.size), allocation)
+    means = np.array([np.bincount(index, weights=column) for column in values.T]).T / allocation[:, None]
+    squares = np.array([np.bincount(index, weights=column ** 2) for column in values.T]).T / allocation[:, None]
+    within = (squares - means ** 2) * allocation[:, None] / (allocation[:, None] - 1)
+    mass = pmf[strata][:, None]
+    estimate = (mass * means).sum(axis=0)
+    error = np.sqrt((mass ** 2 * np.maximum(within, 0) / allocation[:, None]).sum(axis=0))
+    variance = (mass * (np.maximum(within, 0) + means ** 2)).sum(axis=0) - estimate ** 2
+    return _answers(estimate, error, variance, int(allocation.sum()), pmf, level)